@@ -1,15 +1,20 @@
 # app/generators.py
 from __future__ import annotations
 import math
+from dataclasses import dataclass
 from typing import List, Tuple, Set
 import numpy as np
-from .hexgrid import Hex, axial_to_pixel, aspect_ratio, eccentricity, exposed_edges
+from .hexgrid import (Hex, axial_to_pixel, aspect_ratio, eccentricity, exposed_edges,
+                      cov2x2, eig2x2_sym, SQRT3, SQRT3_HALF, ORIGIN, ORIGIN_NEIGHBORS,
+                      DIRECTIONS)
 
 # -------------------------------
 # 1) Ellipse-mask (compact by construction, aspect-aware)
 # -------------------------------
+_HEX_AREA_UNIT = 3.0 * SQRT3 / 2.0
+
 def _hex_area(R: float) -> float:
-    return (3.0 * math.sqrt(3.0) / 2.0) * (R**2)
+    return _HEX_AREA_UNIT * (R * R)
 
 def _ellipse_radii(N: int, aspect: float, R: float) -> Tuple[float,float]:
     # pi * Rx * Ry ~= N * A_hex; Rx/Ry = aspect => Rx = k*aspect, Ry = k
@@ -25,39 +30,34 @@ def ellipse_mask_layout(N: int, R: float, aspect: float, seed: int) -> List[Hex]
 
     # axial ranges generous enough to cover ellipse + margin
     q_max = int(math.ceil((Rx / (1.5*R)) * 1.4)) + 4
-    r_max = int(math.ceil((Ry / (math.sqrt(3)*R)) * 1.4)) + 4
-
-    candidates: List[Tuple[float, Hex]] = []
-    for q in range(-q_max, q_max+1):
-        for r in range(-r_max, r_max+1):
-            h = Hex(q, r)
-            x, y = axial_to_pixel(h, R)
-            d2 = (x/max(1e-9, Rx))**2 + (y/max(1e-9, Ry))**2
-            # keep a broad shell then sort; add tiny jitter to break ties
-            if d2 <= 1.75:
-                candidates.append((d2 + rng.normal(0, 1e-6), h))
-
-    candidates.sort(key=lambda t: t[0])
-    # remove dupes and truncate
-    seen = set()
-    picked: List[Hex] = []
-    for _, h in candidates:
-        key = (h.q, h.r)
-        if key in seen: 
-            continue
-        picked.append(h); seen.add(key)
-        if len(picked) >= N: break
+    r_max = int(math.ceil((Ry / (SQRT3*R)) * 1.4)) + 4
+
+    Q, Rr = np.meshgrid(np.arange(-q_max, q_max+1), np.arange(-r_max, r_max+1), indexing='ij')
+    x = R * (1.5 * Q)
+    y = R * (SQRT3_HALF * Q + SQRT3 * Rr)
+    d2 = (x/max(1e-9, Rx))**2 + (y/max(1e-9, Ry))**2
+    # keep a broad shell then sort; add tiny jitter to break ties
+    mask = d2 <= 1.75
+    qs, rs = Q[mask], Rr[mask]
+    d2 = d2[mask] + rng.normal(0, 1e-6, size=qs.size)
+
+    # (q, r) are unique by construction, so no dedupe; O(M) partition, then
+    # order only the k kept cells
+    k = max(0, min(N, d2.size))
+    idx = np.argpartition(d2, k - 1)[:k] if 0 < k < d2.size else np.arange(k)
+    idx = idx[np.argsort(d2[idx], kind='stable')]
+    picked: List[Hex] = [Hex(q, r) for q, r in zip(qs[idx].tolist(), rs[idx].tolist())]
+    seen = {(h.q, h.r) for h in picked}
 
     if len(picked) < N:
         # pad with nearest neighbors if ellipse shell was too tight (rare)
         S = set(picked)
         while len(picked) < N:
-            ring = []
-            for c in list(S):
+            ring = []; ring_set = set()
+            for c in S:
                 for nb in c.neighbors():
-                    if nb not in S:
-                        ring.append(nb)
-            ring = list(dict.fromkeys(ring))  # unique order-preserving
+                    if nb not in S and nb not in ring_set:
+                        ring_set.add(nb); ring.append(nb)
             if not ring:
                 break
             # choose closest to center
@@ -75,57 +75,107 @@ def _cov_eccentricity(S: Set[Hex], R: float) -> float:
     if not S or len(S) <= 2:
         return 0.0
     xs, ys = zip(*(axial_to_pixel(h, R) for h in S))
-    X = np.vstack([np.array(xs) - np.mean(xs), np.array(ys) - np.mean(ys)])
-    C = (X @ X.T) / max(1, X.shape[1] - 1)
-    vals, _ = np.linalg.eig(C)
-    lam_max = float(np.max(vals)); lam_min = float(np.min(vals))
+    lam_min, lam_max = eig2x2_sym(*cov2x2(xs, ys))
     d = lam_max + lam_min
     if d <= 1e-9: return 0.0
     return (lam_max - lam_min) / d
 
 def _neighbor_count(h: Hex, S: Set[Hex]) -> int:
-    return sum(1 for dq,dr in [(1,0),(1,-1),(0,-1),(-1,0),(-1,1),(0,1)]
-               if Hex(h.q+dq, h.r+dr) in S)
+    return sum(1 for dq,dr in DIRECTIONS if Hex(h.q+dq, h.r+dr) in S)
+
+@dataclass
+class _Moments:
+    """Running sums and center bbox of a growing set's pixel coordinates.
+
+    Lets candidate metrics for S | {c} be evaluated in O(1) instead of
+    re-enumerating S for every frontier candidate.
+    """
+    n: int = 0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxx: float = 0.0
+    sxy: float = 0.0
+    syy: float = 0.0
+    x0: float = math.inf
+    y0: float = math.inf
+    x1: float = -math.inf
+    y1: float = -math.inf
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        self.sx += x; self.sy += y
+        self.sxx += x*x; self.sxy += x*y; self.syy += y*y
+        self.x0 = min(self.x0, x); self.y0 = min(self.y0, y)
+        self.x1 = max(self.x1, x); self.y1 = max(self.y1, y)
+
+    def aspect_with(self, xs: np.ndarray, ys: np.ndarray, R: float) -> np.ndarray:
+        # matches hexgrid.aspect_ratio (full-tile padding) for S | {(x, y)}, per candidate
+        w = np.maximum(self.x1, xs) - np.minimum(self.x0, xs) + SQRT3 * R
+        h = np.maximum(self.y1, ys) - np.minimum(self.y0, ys) + 2.0 * R
+        return np.maximum(1e-6, w) / np.maximum(1e-6, h)
+
+    def eccentricity_with(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        # matches _cov_eccentricity for S | {(x, y)}, per candidate
+        n = self.n + 1
+        if n <= 2:
+            return np.zeros_like(xs)
+        sx = self.sx + xs; sy = self.sy + ys
+        k = n - 1
+        a = (self.sxx + xs*xs - sx*sx/n) / k
+        b = (self.sxy + xs*ys - sx*sy/n) / k
+        d = (self.syy + ys*ys - sy*sy/n) / k
+        # closed-form eig2x2_sym, broadcast over candidates
+        t = 0.5 * (a + d)
+        r = np.hypot(0.5 * (a - d), b)
+        lam_min, lam_max = t - r, t + r
+        tr = lam_max + lam_min
+        return np.where(tr <= 1e-9, 0.0, (lam_max - lam_min) / np.maximum(tr, 1e-9))
+
+_COHESION = np.array([0.10, 0.35, 1.00, 0.9, 0.8, 0.7, 0.6])
 
-def _candidate_score(S: Set[Hex], c: Hex, R: float, aspect: float) -> float:
-    S2 = set(S); S2.add(c)
+def _candidate_scores(S: Set[Hex], cand: List[Hex], R: float, log_aspect: float, mom: _Moments,
+                      exp_S: int) -> np.ndarray:
+    xs, ys = np.array([axial_to_pixel(c, R) for c in cand], float).reshape(-1, 2).T
     # aspect adherence
-    ar = aspect_ratio(list(S2), R); err = abs(math.log(max(1e-9, ar/aspect)))
-    aspect_term = math.exp(-9.0 * err * err)
+    ar = mom.aspect_with(xs, ys, R); err = np.abs(np.log(ar) - log_aspect)
+    aspect_term = np.exp(-9.0 * err * err)
     # cohesion
-    n_adj = _neighbor_count(c, S)
-    cohesion = [0.10, 0.35, 1.00, 0.9, 0.8, 0.7, 0.6][min(6, n_adj)]
+    n_adj = np.array([_neighbor_count(c, S) for c in cand], dtype=np.int64)
+    cohesion = _COHESION[np.minimum(6, n_adj)]
     # anti-line
-    anti = math.exp(-10.0 * _cov_eccentricity(S2, R))
+    anti = np.exp(-10.0 * mom.eccentricity_with(xs, ys))
     # exposed edges penalty (compactness)
-    exp = exposed_edges(S2)
+    exp = exp_S + 6 - 2 * n_adj  # == exposed_edges(S | {c})
     compact = 1.0 / (1.0 + exp)
     return 0.50*aspect_term + 0.25*cohesion + 0.15*anti + 0.10*compact
 
 def compact_growth_layout(N: int, R: float, aspect: float, seed: int) -> List[Hex]:
     rng = np.random.default_rng(int(seed))
-    S: Set[Hex] = {Hex(0,0)}
-    frontier: Set[Hex] = set(Hex(0,0).neighbors())
+    S: Set[Hex] = {ORIGIN}
+    frontier: Set[Hex] = set(ORIGIN_NEIGHBORS)
+    mom = _Moments(); mom.add(*axial_to_pixel(ORIGIN, R))
+    exp_S = exposed_edges(S)
+    log_aspect = math.log(max(1e-9, aspect))
     while len(S) < N and frontier:
         cand = list(frontier)
-        scores = np.array([_candidate_score(S, c, R, aspect) for c in cand], float)
-        smax = float(scores.max())
-        # tempered softmax
-        probs = np.exp((scores - smax) / 0.08); probs /= probs.sum()
-        chosen = cand[int(rng.choice(len(cand), p=probs))]
-        S.add(chosen); frontier.remove(chosen)
+        scores = _candidate_scores(S, cand, R, log_aspect, mom, exp_S)
+        # tempered softmax, sampled via Gumbel-max
+        chosen = cand[int(np.argmax(scores / 0.08 + rng.gumbel(size=scores.size)))]
+        exp_S += 6 - 2 * _neighbor_count(chosen, S)
+        S.add(chosen); frontier.remove(chosen); mom.add(*axial_to_pixel(chosen, R))
         for nb in chosen.neighbors():
             if nb not in S:
                 frontier.add(nb)
     # if still short, fill best perimeter
     while len(S) < N:
-        ring = []
-        for h in list(S):
+        ring = []; ring_set = set()
+        for h in S:
             for nb in h.neighbors():
-                if nb not in S and nb not in ring:
-                    ring.append(nb)
+                if nb not in S and nb not in ring_set:
+                    ring_set.add(nb); ring.append(nb)
         if not ring:
             break
-        ring.sort(key=lambda c: _candidate_score(S, c, R, aspect), reverse=True)
-        S.add(ring[0])
+        best = ring[int(np.argmax(_candidate_scores(S, ring, R, log_aspect, mom, exp_S)))]
+        exp_S += 6 - 2 * _neighbor_count(best, S)
+        S.add(best); mom.add(*axial_to_pixel(best, R))
     return list(S)[:N]
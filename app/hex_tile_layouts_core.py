@@ -3,20 +3,24 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Set
+from functools import lru_cache
+from typing import List, Optional, Tuple, Dict, Set
 
 import io
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.patches import RegularPolygon
+from matplotlib.collections import PolyCollection
 from PIL import Image
 
+from .hexgrid import PNG_COMPRESS_LEVEL
+
 # -------------------------------
 # Hex grid math (pointy-topped)
 # -------------------------------
 DIRECTIONS: List[Tuple[int, int]] = [
     (1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)
 ]
+DIR_ARR = np.array(DIRECTIONS, dtype=np.int32)  # (6, 2), for vectorized neighbour lookups
 
 @dataclass(frozen=True)
 class Hex:
@@ -26,11 +30,20 @@ class Hex:
     def neighbors(self) -> List["Hex"]:
         return [Hex(self.q + dq, self.r + dr) for (dq, dr) in DIRECTIONS]
 
+ORIGIN = Hex(0, 0)
+ORIGIN_NEIGHBORS: Tuple[Hex, ...] = tuple(ORIGIN.neighbors())
+
+SQRT3 = math.sqrt(3.0)
+SQRT3_HALF = SQRT3 / 2.0
+
+@lru_cache(maxsize=None)
+def _axial_unit(q: int, r: int) -> Tuple[float, float]:
+    # pointy-top axial position at R == 1; scaled by R in axial_to_pixel
+    return 1.5 * q, SQRT3_HALF * q + SQRT3 * r
+
 def axial_to_pixel(h: Hex, R: float) -> Tuple[float, float]:
-    # pointy-top axial
-    x = R * (1.5 * h.q)
-    y = R * (math.sqrt(3)/2 * h.q + math.sqrt(3) * h.r)
-    return x, y
+    ux, uy = _axial_unit(h.q, h.r)
+    return R * ux, R * uy
 
 # -------------------------------
 # Params (v2 semantics; N colors)
@@ -62,6 +75,9 @@ class LayoutParams:
     def aspect(self) -> float:
         return max(1e-6, self.aspect_w / self.aspect_h)
 
+    def log_aspect(self) -> float:
+        return math.log(self.aspect())
+
 # -------------------------------
 # Bounding / aspect helpers
 # -------------------------------
@@ -71,160 +87,257 @@ def bounds_px(hexes: Set[Hex], R: float) -> Tuple[float, float, float, float]:
 
 def full_tile_bbox(hexes: List[Hex], params: LayoutParams) -> Tuple[float, float, float, float]:
     xs, ys = zip(*(axial_to_pixel(h, params.radius) for h in hexes))
-    dx = (math.sqrt(3) / 2.0) * params.radius
+    dx = SQRT3_HALF * params.radius
     dy = 1.0 * params.radius
     return min(xs)-dx, min(ys)-dy, max(xs)+dx, max(ys)+dy
 
-def aspect_ratio_from_hexes(hexes: Set[Hex], params: LayoutParams) -> float:
-    if not hexes:
-        return 1.0
-    x0, y0, x1, y1 = bounds_px(hexes, params.radius)
-    dx = (math.sqrt(3) / 2.0) * params.radius
-    dy = 1.0 * params.radius
+def bbox_with(bbox: Tuple[float, float, float, float], x: float, y: float) -> Tuple[float, float, float, float]:
+    # center bbox after adding one point; O(1) instead of rescanning the set
+    x0, y0, x1, y1 = bbox
+    return min(x0, x), min(y0, y), max(x1, x), max(y1, y)
+
+def aspect_ratio_from_bbox(bbox: Tuple[float, float, float, float], R: float) -> float:
+    x0, y0, x1, y1 = bbox
+    dx = SQRT3_HALF * R
+    dy = 1.0 * R
     w = (x1 - x0) + 2*dx
     h = (y1 - y0) + 2*dy
     return max(1e-6, w / h)
 
+def aspect_ratio_from_hexes(hexes: Set[Hex], params: LayoutParams) -> float:
+    if not hexes:
+        return 1.0
+    return aspect_ratio_from_bbox(bounds_px(hexes, params.radius), params.radius)
+
 def aspect_error(ratio: float, target: float) -> float:
     return abs(math.log(max(1e-9, ratio/target)))
 
+def log_aspect_error(ratio: float, log_target: float) -> float:
+    # aspect_error with log(target) hoisted out of the loop (ratio is >= 1e-6)
+    return abs(math.log(ratio) - log_target)
+
 # -------------------------------
 # Scoring & growth (v2-ish)
 # -------------------------------
-def candidate_score(hexes: Set[Hex], candidate: Hex, params: LayoutParams) -> float:
-    new_set = set(hexes); new_set.add(candidate)
+@dataclass(frozen=True)
+class ScoreWeights:
+    """Loop-invariant scoring constants derived from LayoutParams."""
+    k: float            # aspect penalty steepness
+    w_aspect: float
+    w_compact: float
+    area_norm: float    # R^2 * N
+    log_target: float
+    pad_w: float        # full-tile padding added to center-bbox width/height
+    pad_h: float
+
+    @classmethod
+    def from_params(cls, params: LayoutParams) -> "ScoreWeights":
+        w_aspect = 0.65 + 0.30 * params.aspect_adherence
+        return cls(k=4.0 + 18.0 * params.aspect_adherence,
+                   w_aspect=w_aspect,
+                   w_compact=params.compactness_bias * (1.0 - w_aspect),
+                   area_norm=params.radius * params.radius * max(1, params.total_tiles),
+                   log_target=params.log_aspect(),
+                   pad_w=2 * (SQRT3_HALF * params.radius),
+                   pad_h=2 * (1.0 * params.radius))
+
+def score_from_bbox(bbox: Tuple[float, float, float, float], params: LayoutParams,
+                    sw: Optional[ScoreWeights] = None) -> float:
+    sw = sw or ScoreWeights.from_params(params)
+    x0, y0, x1, y1 = bbox
+    width = (x1 - x0) + sw.pad_w
+    height = (y1 - y0) + sw.pad_h
 
     # Aspect adherence
-    r = aspect_ratio_from_hexes(new_set, params)
-    err = aspect_error(r, params.aspect())
-    k = 4.0 + 18.0 * params.aspect_adherence  # penalty steepness
-    aspect_term = math.exp(-k * err * err)
+    err = log_aspect_error(max(1e-6, width / height), sw.log_target)
+    aspect_term = math.exp(-sw.k * err * err)
 
     # Compactness
-    x0, y0, x1, y1 = bounds_px(new_set, params.radius)
-    dx = (math.sqrt(3) / 2.0) * params.radius
-    dy = 1.0 * params.radius
-    width = (x1 - x0) + 2*dx
-    height = (y1 - y0) + 2*dy
-    area = width * height
-    compact_term = 1.0 / (1.0 + area / (params.radius * params.radius * max(1, params.total_tiles)))
+    compact_term = 1.0 / (1.0 + width * height / sw.area_norm)
 
     # Blend
-    w_aspect = 0.65 + 0.30 * params.aspect_adherence
-    w_compact = params.compactness_bias * (1.0 - w_aspect)
-    return 1e-6 + (w_aspect * aspect_term + w_compact * compact_term)
+    return 1e-6 + (sw.w_aspect * aspect_term + sw.w_compact * compact_term)
+
+def scores_from_bbox(bbox: Tuple[float, float, float, float], xs: np.ndarray, ys: np.ndarray,
+                     params: LayoutParams, sw: Optional[ScoreWeights] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized score_from_bbox over candidate centers (xs, ys) joining a set
+    with center bbox `bbox`. Returns (scores, aspect_errors)."""
+    sw = sw or ScoreWeights.from_params(params)
+    x0, y0, x1, y1 = bbox
+    width = (np.maximum(x1, xs) - np.minimum(x0, xs)) + sw.pad_w
+    height = (np.maximum(y1, ys) - np.minimum(y0, ys)) + sw.pad_h
+
+    err = np.abs(np.log(np.maximum(1e-6, width / height)) - sw.log_target)
+    aspect_term = np.exp(-sw.k * err * err)
+    compact_term = 1.0 / (1.0 + (width * height) / sw.area_norm)
+    return 1e-6 + (sw.w_aspect * aspect_term + sw.w_compact * compact_term), err
+
+def candidate_score(hexes: Set[Hex], candidate: Hex, params: LayoutParams) -> float:
+    x, y = axial_to_pixel(candidate, params.radius)
+    bbox = bounds_px(hexes, params.radius) if hexes else (x, y, x, y)
+    return score_from_bbox(bbox_with(bbox, x, y), params)
+
+# Packed axial keys for the growth loop: key = q * 2**32 + r, so the
+# neighbour in direction i is key + DIR_PACKED[i]; Hex objects are only
+# built for the returned set.
+_R_MASK = (1 << 32) - 1
+_R_HALF = 1 << 31
+
+def pack(q: int, r: int) -> int:
+    return (q << 32) + r
+
+def unpack(key: int) -> Tuple[int, int]:
+    r = ((key + _R_HALF) & _R_MASK) - _R_HALF
+    return (key - r) >> 32, r
+
+DIR_PACKED: Tuple[int, ...] = tuple(pack(dq, dr) for dq, dr in DIRECTIONS)
+
+def _packed_to_pixels(keys: List[int], R: float) -> Tuple[np.ndarray, np.ndarray]:
+    k = np.array(keys, dtype=np.int64)
+    r = ((k + _R_HALF) & _R_MASK) - _R_HALF
+    q = (k - r) >> 32
+    return R * (1.5 * q), R * (SQRT3_HALF * q + SQRT3 * r)
 
 def grow_blob(n: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex]:
-    S: Set[Hex] = {Hex(0, 0)}
-    frontier: Set[Hex] = set(S.pop().neighbors()); S.add(Hex(0, 0))
+    S: Set[int] = {pack(0, 0)}
+    frontier: Set[int] = set(DIR_PACKED)
+    R = params.radius
+    bbox = bounds_px({ORIGIN}, R)  # running center bbox of S
 
     tol_log = (0.40 - 0.33 * params.aspect_adherence)  # loose..strict
+    sw = ScoreWeights.from_params(params)
 
     while len(S) < n and frontier:
         candidates = list(frontier)
-        scores = np.array([candidate_score(S, c, params) for c in candidates], float)
+        xs, ys = _packed_to_pixels(candidates, R)
+        scores, errs = scores_from_bbox(bbox, xs, ys, params, sw)
 
         # Downweight candidates that exceed aspect tolerance
         if len(S) > 3:
-            errs = [aspect_error(aspect_ratio_from_hexes(S | {c}, params), params.aspect()) for c in candidates]
-            mask = np.array([1.0 if e <= tol_log else 0.10 for e in errs])
-            scores = scores * mask
+            scores = scores * np.where(errs <= tol_log, 1.0, 0.10)
 
-        if np.all(scores == 0):
-            probs = np.ones_like(scores) / len(scores)
-        else:
-            scores = scores - scores.max()
-            probs = np.exp(scores); probs /= probs.sum()
-
-        chosen = candidates[int(rng.choice(len(candidates), p=probs))]
+        # Gumbel-max: argmax(scores + G) samples from softmax(scores) without
+        # normalizing (all-zero scores give a uniform pick)
+        idx = int(np.argmax(scores + rng.gumbel(size=scores.size)))
+        chosen = candidates[idx]; bbox = bbox_with(bbox, float(xs[idx]), float(ys[idx]))
         S.add(chosen); frontier.remove(chosen)
-        for nb in chosen.neighbors():
-            if nb not in S:
-                frontier.add(nb)
+        for d in DIR_PACKED:
+            if chosen + d not in S:
+                frontier.add(chosen + d)
 
     # fill if undershoot
     while len(S) < n:
-        ring: List[Hex] = []
-        for h in list(S):
-            for nb in h.neighbors():
-                if nb not in S and nb not in ring:
-                    ring.append(nb)
+        ring: List[int] = []; ring_set: Set[int] = set()
+        for h in S:
+            for d in DIR_PACKED:
+                nb = h + d
+                if nb not in S and nb not in ring_set:
+                    ring_set.add(nb); ring.append(nb)
         if not ring:
             break
-        best, best_sc = None, -1.0
-        for c in ring:
-            sc = candidate_score(S, c, params)
-            if sc > best_sc:
-                best, best_sc = c, sc
-        if best is None: break
-        S.add(best)
+        xs, ys = _packed_to_pixels(ring, R)
+        scores, _ = scores_from_bbox(bbox, xs, ys, params, sw)
+        idx = int(np.argmax(scores))
+        S.add(ring[idx]); bbox = bbox_with(bbox, float(xs[idx]), float(ys[idx]))
 
-    return S
+    return {Hex(*unpack(k)) for k in S}
 
-def perimeter_with_open_dirs(S: Set[Hex]) -> List[Tuple[Hex, List[Tuple[int, int]]]]:
-    out: List[Tuple[Hex, List[Tuple[int, int]]]] = []
-    for h in S:
-        opens = []
-        for d in DIRECTIONS:
-            nb = Hex(h.q + d[0], h.r + d[1])
-            if nb not in S:
-                opens.append(d)
-        if opens:
-            out.append((h, opens))
-    return out
+def perimeter_with_open_dirs(S: Set[Hex]) -> List[Tuple[Hex, List[int]]]:
+    # open sides as indices into DIRECTIONS; the opposite of side i is (i + 3) % 6
+    hexes = list(S)
+    if not hexes:
+        return []
+    # occupancy grid with a one-cell margin so every neighbour lookup is in range
+    qr = np.array([(h.q, h.r) for h in hexes], dtype=np.int32)
+    q0, r0 = qr.min(axis=0) - 1
+    occ = np.zeros(tuple(qr.max(axis=0) - (q0, r0) + 2), dtype=np.bool_)
+    qi, ri = qr[:, 0] - q0, qr[:, 1] - r0
+    occ[qi, ri] = True
+    open_mask = ~occ[qi[:, None] + DIR_ARR[:, 0], ri[:, None] + DIR_ARR[:, 1]]  # (n, 6)
+    # entries follow S's iteration order, which the seeded tendril picks index into
+    return [(h, np.flatnonzero(row).tolist())
+            for h, row in zip(hexes, open_mask) if row.any()]
+
+def add_to_perimeter(open_map: Dict[Hex, List[int]], S: Set[Hex], h: Hex) -> None:
+    # update {hex: open dir indices} after S.add(h); only h and its neighbours change
+    nbs = h.neighbors()
+    opens = [i for i, nb in enumerate(nbs) if nb not in S]
+    if opens:
+        open_map[h] = opens
+    for i, nb in enumerate(nbs):
+        dirs = open_map.get(nb)
+        if dirs is not None:
+            dirs.remove((i + 3) % 6)
+            if not dirs:
+                del open_map[nb]
 
 def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex]:
     if len(S) >= total_target or params.tendrils <= 0: return S
-    perim = perimeter_with_open_dirs(S)
+    open_map = dict(perimeter_with_open_dirs(S))
+    perim = list(open_map.items())
     if not perim: return S
 
     tol_log = (0.45 - 0.35 * params.aspect_adherence)
+    R = params.radius
+    bbox = bounds_px(S, R)  # running center bbox of S
+    log_target = params.log_aspect()
+    sw = ScoreWeights.from_params(params)
+
+    def err_with(h: Hex) -> float:
+        return log_aspect_error(aspect_ratio_from_bbox(bbox_with(bbox, *axial_to_pixel(h, R)), R),
+                                log_target)
 
     lengths = [int(rng.integers(params.tendril_len_min, params.tendril_len_max + 1))
                for _ in range(params.tendrils)]
     for L in lengths:
         if len(S) >= total_target or not perim: break
         start, dirs = perim[int(rng.integers(0, len(perim)))]
-        direction = dirs[int(rng.integers(0, len(dirs)))]
-        current = Hex(start.q + direction[0], start.r + direction[1])
+        d_idx = dirs[int(rng.integers(0, len(dirs)))]
+        dq, dr = DIRECTIONS[d_idx]
+        current = Hex(start.q + dq, start.r + dr)
         steps = 0
         while steps < L and len(S) < total_target:
-            e = aspect_error(aspect_ratio_from_hexes(S | {current}, params), params.aspect())
+            e = err_with(current)
             if e > tol_log:
-                back = Hex(current.q - direction[0], current.r - direction[1])
-                alt_dirs = [d for d in DIRECTIONS if Hex(back.q + d[0], back.r + d[1]) not in S]
-                if not alt_dirs: break
-                best_dir, best_err = None, float('inf')
-                for d in alt_dirs:
-                    cand = Hex(back.q + d[0], back.r + d[1])
-                    ee = aspect_error(aspect_ratio_from_hexes(S | {cand}, params), params.aspect())
+                back = Hex(current.q - dq, current.r - dr)
+                alt = [(i, nb) for i, nb in enumerate(back.neighbors()) if nb not in S]
+                if not alt: break
+                best_idx, best_err = None, float('inf')
+                for i, cand in alt:
+                    ee = err_with(cand)
                     if ee < best_err:
-                        best_err, best_dir = ee, d
-                if best_dir is None or best_err > tol_log: break
-                direction = best_dir
-                current = Hex(back.q + direction[0], back.r + direction[1])
+                        best_err, best_idx = ee, i
+                if best_idx is None or best_err > tol_log: break
+                d_idx = best_idx
+                dq, dr = DIRECTIONS[d_idx]
+                current = Hex(back.q + dq, back.r + dr)
 
             if current in S: break
-            S.add(current); steps += 1
+            S.add(current); add_to_perimeter(open_map, S, current); steps += 1
+            bbox = bbox_with(bbox, *axial_to_pixel(current, R))
             if rng.random() < params.tendril_direction_variability:
-                idx = DIRECTIONS.index(direction)
                 turn = int(rng.choice([-1, 1]))
-                direction = DIRECTIONS[(idx + turn) % 6]
-            current = Hex(current.q + direction[0], current.r + direction[1])
-        perim = perimeter_with_open_dirs(S)
+                d_idx = (d_idx + turn) % 6
+                dq, dr = DIRECTIONS[d_idx]
+            current = Hex(current.q + dq, current.r + dr)
+        perim = list(open_map.items())
 
     while len(S) < total_target:
-        perim = perimeter_with_open_dirs(S)
+        perim = list(open_map.items())
         if not perim: break
         best, best_sc = None, -1.0
+        seen: Set[Hex] = set()
         for (start, dirs) in perim:
-            for d in dirs:
-                cand = Hex(start.q + d[0], start.r + d[1])
-                sc = candidate_score(S, cand, params)
+            for i in dirs:
+                cand = Hex(start.q + DIRECTIONS[i][0], start.r + DIRECTIONS[i][1])
+                if cand in seen: continue
+                seen.add(cand)
+                sc = score_from_bbox(bbox_with(bbox, *axial_to_pixel(cand, R)), params, sw)
                 if sc > best_sc and cand not in S:
                     best, best_sc = cand, sc
         if best is None: break
-        S.add(best)
+        S.add(best); add_to_perimeter(open_map, S, best)
+        bbox = bbox_with(bbox, *axial_to_pixel(best, R))
     return S
 
 # -------------------------------
@@ -239,12 +352,12 @@ def assign_colors_random(hexes: List[Hex], rng: np.random.Generator,
     return pal[:len(hexes)]
 
 def principal_axis(xs: np.ndarray, ys: np.ndarray) -> Tuple[float, float]:
-    X = np.vstack([xs - xs.mean(), ys - ys.mean()])
-    C = X @ X.T / max(1, X.shape[1] - 1)
-    vals, vecs = np.linalg.eig(C)
-    v = vecs[:, int(np.argmax(vals))]
-    vx, vy = float(v[0]), float(v[1]); n = math.hypot(vx, vy) or 1.0
-    return vx/n, vy/n
+    # closed-form leading eigenvector of the 2x2 covariance [[a, b], [b, d]];
+    # theta in (-pi/2, pi/2] keeps vx >= 0 so gradients run low->high along +x
+    x = xs - xs.mean(); y = ys - ys.mean()
+    a, b, d = float(x @ x), float(x @ y), float(y @ y)
+    theta = 0.5 * math.atan2(2.0 * b, a - d)
+    return math.cos(theta), math.sin(theta)
 
 def assign_colors_gradient(hexes: List[Hex], rng: np.random.Generator, params: LayoutParams) -> List[str]:
     xs, ys = zip(*(axial_to_pixel(h, params.radius) for h in hexes))
@@ -255,8 +368,10 @@ def assign_colors_gradient(hexes: List[Hex], rng: np.random.Generator, params: L
     elif ax == "y": vx, vy = 0.0, 1.0
     else: vx, vy = principal_axis(xs, ys)
 
-    s = xs*vx + ys*vy
-    s = s + rng.normal(0.0, 0.02*params.radius, size=len(s))
+    # projection plus jitter, accumulated in place (same draws as rng.normal)
+    s = xs * vx; s += ys * vy
+    noise = rng.standard_normal(s.size); noise *= 0.02*params.radius
+    s += noise
     idxs = np.argsort(s)
 
     order = list(params.gradient_order or list(range(len(params.colors))))
@@ -297,25 +412,20 @@ def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: L
     else:
         roles = params.roles
 
-    remaining = {i: int(params.counts[i]) for i in range(len(params.colors))}
-    color_for_idx: Dict[int, str] = {}
+    remaining = np.maximum(0, np.array(params.counts, dtype=np.int64))
+    palette = np.array(params.colors, dtype=object)
+    color_idx = np.empty(N, dtype=np.int64)
 
     def fill_zone(indices: List[int], pref: int, fallbacks: List[int]):
-        rng.shuffle(indices)
-        for i in indices:
-            pick = None
-            if remaining.get(pref, 0) > 0:
-                pick = pref
-            else:
-                for fb in fallbacks:
-                    if remaining.get(fb, 0) > 0:
-                        pick = fb; break
-            if pick is None:
-                # final fallback to any available
-                avail = [fi for fi, k in remaining.items() if k > 0]
-                pick = (avail[0] if avail else pref)
-            color_for_idx[i] = params.colors[pick]
-            remaining[pick] = max(0, remaining.get(pick, 0) - 1)
+        # shuffled zone takes pref while it lasts, then each fallback in order;
+        # once every quota is spent the rest fall back to pref
+        idx = np.array(indices, dtype=np.int64)
+        rng.shuffle(idx)
+        order = np.array([pref] + fallbacks, dtype=np.int64)
+        seq = np.repeat(order, remaining[order])[:idx.size]
+        remaining[:] -= np.bincount(seq, minlength=remaining.size)
+        color_idx[idx] = pref
+        color_idx[idx[:seq.size]] = seq
 
     idx_all = list(range(len(params.colors)))
     dom, sec, acc = roles['dominant'], roles['secondary'], roles['accent']
@@ -323,33 +433,32 @@ def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: L
     fill_zone(zones[1], sec, [i for i in idx_all if i != sec])
     fill_zone(zones[2], acc, [i for i in idx_all if i != acc])
 
-    # fill any holes
-    for i in range(N):
-        if i not in color_for_idx:
-            avail = [fi for fi, k in remaining.items() if k > 0]
-            pick = (avail[0] if avail else dom)
-            color_for_idx[i] = params.colors[pick]
-            remaining[pick] = max(0, remaining.get(pick, 0) - 1)
-
-    return [color_for_idx[i] for i in range(N)]
+    return palette[color_idx].tolist()
 
 # -------------------------------
 # Rendering helpers
 # -------------------------------
-def plot_layout_on_ax(ax, hexes: List[Hex], colors_assigned: List[str],
-                      params: LayoutParams, title: str = "") -> Tuple[float, float]:
-    for (h, c) in sorted(zip(hexes, colors_assigned), key=lambda t: (t[0].q, t[0].r)):
-        x, y = axial_to_pixel(h, params.radius)
-        ax.add_patch(
-            RegularPolygon((x, y), numVertices=6, radius=params.radius,
-                           orientation=math.radians(30),
-                           edgecolor='black', facecolor=c, linewidth=1.0)
-        )
+_HEX_CORNERS = np.radians(60.0 * np.arange(6))  # pointy-top axial -> flat-side-up tiles
+
+def hex_vertices(hexes: List[Hex], R: float) -> np.ndarray:
+    # (N, 6, 2) polygon corners for every tile, for one PolyCollection
+    c = np.array([axial_to_pixel(h, R) for h in hexes], float).reshape(-1, 2)
+    return np.stack([c[:, :1] + R * np.cos(_HEX_CORNERS),
+                     c[:, 1:] + R * np.sin(_HEX_CORNERS)], axis=-1)
+
+def layout_dims_in(hexes: List[Hex], params: LayoutParams) -> Tuple[float, float]:
+    # physical bounding box (inches) for a 6in tile radius
     min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params)
     real_R_in = 6.0
     scale = real_R_in / params.radius
-    w_in = (max_x - min_x) * scale
-    h_in = (max_y - min_y) * scale
+    return (max_x - min_x) * scale, (max_y - min_y) * scale
+
+def plot_layout_on_ax(ax, hexes: List[Hex], colors_assigned: List[str],
+                      params: LayoutParams, title: str = "") -> Tuple[float, float]:
+    ax.add_collection(PolyCollection(hex_vertices(hexes, params.radius), facecolors=colors_assigned,
+                                     edgecolors='black', linewidths=1.0))
+    min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params)
+    w_in, h_in = layout_dims_in(hexes, params)
 
     ax.add_patch(plt.Rectangle((min_x, min_y), max_x-min_x, max_y-min_y,
                                fill=False, edgecolor='green', linewidth=2, linestyle='--'))
@@ -364,17 +473,15 @@ def plot_layout_on_ax(ax, hexes: List[Hex], colors_assigned: List[str],
 def transparent_png_bytes(hexes: List[Hex], colors_assigned: List[str],
                           params: LayoutParams, dpi: int = 220) -> bytes:
     fig, ax = plt.subplots(figsize=(6,5), dpi=dpi)
-    for (h, c) in sorted(zip(hexes, colors_assigned), key=lambda t: (t[0].q, t[0].r)):
-        x, y = axial_to_pixel(h, params.radius)
-        ax.add_patch(RegularPolygon((x, y), numVertices=6, radius=params.radius,
-                                    orientation=math.radians(30),
-                                    edgecolor='none', facecolor=c, linewidth=1.0))
+    ax.add_collection(PolyCollection(hex_vertices(hexes, params.radius), facecolors=colors_assigned,
+                                     edgecolors='none', linewidths=1.0))
     min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params)
     pad = 0.5 * params.radius
     ax.set_xlim(min_x - pad, max_x + pad); ax.set_ylim(min_y - pad, max_y + pad)
     ax.set_aspect('equal'); ax.axis('off')
     buf = io.BytesIO()
-    fig.savefig(buf, format='png', transparent=True, bbox_inches='tight', pad_inches=0)
+    fig.savefig(buf, format='png', transparent=True, bbox_inches='tight', pad_inches=0,
+                pil_kwargs={"compress_level": PNG_COMPRESS_LEVEL})
     plt.close(fig); buf.seek(0)
     return buf.getvalue()
 
@@ -2,11 +2,12 @@
 from __future__ import annotations
 import math
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Tuple, Set
 import io
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.patches import RegularPolygon
+from matplotlib.collections import PolyCollection
 from PIL import Image
 
 # -------------------------------
@@ -22,18 +23,27 @@ class Hex:
     def neighbors(self) -> List["Hex"]:
         return [Hex(self.q + dq, self.r + dr) for (dq, dr) in DIRECTIONS]
 
+ORIGIN = Hex(0, 0)
+ORIGIN_NEIGHBORS: Tuple[Hex, ...] = tuple(ORIGIN.neighbors())
+
+SQRT3 = math.sqrt(3.0)
+SQRT3_HALF = SQRT3 / 2.0
+
+@lru_cache(maxsize=None)
+def _axial_unit(q: int, r: int) -> Tuple[float, float]:
+    # pointy-top axial position at R == 1; scaled by R in axial_to_pixel
+    return 1.5 * q, SQRT3_HALF * q + SQRT3 * r
+
 def axial_to_pixel(h: Hex, R: float) -> Tuple[float, float]:
-    # pointy-top axial
-    x = R * (1.5 * h.q)
-    y = R * ((math.sqrt(3)/2) * h.q + math.sqrt(3) * h.r)
-    return x, y
+    ux, uy = _axial_unit(h.q, h.r)
+    return R * ux, R * uy
 # -------------------------------
 # Metrics
 # -------------------------------
 def pixel_bbox(hexes: List[Hex], R: float) -> Tuple[float, float, float, float]:
     xs, ys = zip(*(axial_to_pixel(h, R) for h in hexes))
     # add full-hex padding so bbox encloses whole tiles
-    dx = (math.sqrt(3)/2.0) * R
+    dx = SQRT3_HALF * R
     dy = 1.0 * R
     return min(xs)-dx, min(ys)-dy, max(xs)+dx, max(ys)+dy
 # public alias (compat with previous code)
@@ -44,59 +54,88 @@ def aspect_ratio(hexes: List[Hex], R: float) -> float:
     x0,y0,x1,y1 = pixel_bbox(hexes, R)
     return max(1e-6, (x1-x0)) / max(1e-6, (y1-y0))
 
+def cov2x2(xs, ys) -> Tuple[float, float, float]:
+    """Sample covariance (var_x, cov_xy, var_y) of point coordinates."""
+    x = np.asarray(xs, dtype=float); y = np.asarray(ys, dtype=float)
+    x = x - x.mean(); y = y - y.mean()
+    k = max(1, x.size - 1)
+    return float(x @ x) / k, float(x @ y) / k, float(y @ y) / k
+
+def eig2x2_sym(a: float, b: float, d: float) -> Tuple[float, float]:
+    """Closed-form eigenvalues (lam_min, lam_max) of [[a, b], [b, d]]."""
+    t = 0.5 * (a + d)
+    s = math.hypot(0.5 * (a - d), b)
+    return t - s, t + s
+
 def eccentricity(hexes: List[Hex], R: float) -> float:
     if len(hexes) < 3:
         return 0.0
     xs, ys = zip(*(axial_to_pixel(h, R) for h in hexes))
-    X = np.vstack([np.array(xs) - np.mean(xs), np.array(ys) - np.mean(ys)])
-    C = (X @ X.T) / max(1, X.shape[1] - 1)
-    vals, _ = np.linalg.eig(C)
-    lam_max = float(np.max(vals))
-    lam_min = float(np.min(vals))
+    lam_min, lam_max = eig2x2_sym(*cov2x2(xs, ys))
     d = lam_max + lam_min
     if d <= 1e-9: 
         return 0.0
     return (lam_max - lam_min) / d  # in [0,1], higher == skinnier
 
-def exposed_edges(S: Set[Hex]) -> int:
-    n = 0
+def bitboard(S: Set[Hex]) -> Tuple[int, int]:
+    """Pack S into one int, bit (r-r0)*W + (q-q0); returns (bits, W).
+
+    Row stride W leaves a zero column after each row so +-1 shifts along q
+    never carry into the next row.
+    """
+    if not S:
+        return 0, 1
+    q0 = min(h.q for h in S); r0 = min(h.r for h in S)
+    W = max(h.q for h in S) - q0 + 2
+    bits = 0
     for h in S:
-        for dq,dr in DIRECTIONS:
-            if Hex(h.q+dq, h.r+dr) not in S:
-                n += 1
-    return n
+        bits |= 1 << ((h.r - r0) * W + (h.q - q0))
+    return bits, W
+
+def exposed_edges(S: Set[Hex]) -> int:
+    # every tile has 6 edges; each adjacent pair hides 2 of them.
+    # shifts by 1, W and W-1 pair each tile with its (-1,0), (0,-1) and
+    # (+1,-1) neighbour, covering every neighbour relation exactly once.
+    bits, W = bitboard(S)
+    pairs = ((bits & (bits >> 1)).bit_count()
+             + (bits & (bits >> W)).bit_count()
+             + (bits & (bits >> (W - 1))).bit_count())
+    return 6 * len(S) - 2 * pairs
 
 # -------------------------------
 # Rendering
 # -------------------------------
+_HEX_CORNERS = np.radians(60.0 * np.arange(6))  # pointy-top axial -> flat-side-up tiles
+PNG_COMPRESS_LEVEL = 1  # zlib fast path: ~3x quicker encode for a few % larger files
+
+def hex_vertices(hexes: List[Hex], R: float) -> np.ndarray:
+    # (N, 6, 2) polygon corners for every tile, for one PolyCollection
+    c = np.array([axial_to_pixel(h, R) for h in hexes], float).reshape(-1, 2)
+    return np.stack([c[:, :1] + R * np.cos(_HEX_CORNERS),
+                     c[:, 1:] + R * np.sin(_HEX_CORNERS)], axis=-1)
+
 def figure_for_layout(hexes: List[Hex], colors: List[str], R: float, border=True) -> plt.Figure:
     fig, ax = plt.subplots(figsize=(6,5))
-    for (h, col) in sorted(zip(hexes, colors), key=lambda t: (t[0].q, t[0].r)):
-        x, y = axial_to_pixel(h, R)
-        ax.add_patch(
-            RegularPolygon((x, y), numVertices=6, radius=R,
-                           orientation=math.radians(30),
-                           edgecolor='black' if border else 'none',
-                           facecolor=col, linewidth=1.0)
-        )
+    ax.add_collection(PolyCollection(hex_vertices(hexes, R), facecolors=colors,
+                                     edgecolors='black' if border else 'none', linewidths=1.0))
+    # explicit limits: add_collection only autoscales on matplotlib >= 3.11
+    x0,y0,x1,y1 = full_tile_bbox(hexes, R)
+    pad = 0.5 * R
+    ax.set_xlim(x0 - pad, x1 + pad); ax.set_ylim(y0 - pad, y1 + pad)
     ax.set_aspect('equal'); ax.axis('off')
     return fig
 
 def transparent_png_bytes(hexes: List[Hex], colors: List[str], R: float, dpi: int=220) -> bytes:
     fig, ax = plt.subplots(figsize=(6,5), dpi=dpi)
-    for (h, col) in sorted(zip(hexes, colors), key=lambda t: (t[0].q, t[0].r)):
-        x, y = axial_to_pixel(h, R)
-        ax.add_patch(
-            RegularPolygon((x, y), numVertices=6, radius=R,
-                           orientation=math.radians(30),
-                           edgecolor='none', facecolor=col, linewidth=1.0)
-        )
+    ax.add_collection(PolyCollection(hex_vertices(hexes, R), facecolors=colors,
+                                     edgecolors='none', linewidths=1.0))
     x0,y0,x1,y1 = full_tile_bbox(hexes, R)
     pad = 0.5 * R
     ax.set_xlim(x0 - pad, x1 + pad); ax.set_ylim(y0 - pad, y1 + pad)
     ax.set_aspect('equal'); ax.axis('off')
     buf = io.BytesIO()
-    fig.savefig(buf, format='png', transparent=True, bbox_inches='tight', pad_inches=0)
+    fig.savefig(buf, format='png', transparent=True, bbox_inches='tight', pad_inches=0,
+                pil_kwargs={"compress_level": PNG_COMPRESS_LEVEL})
     plt.close(fig); buf.seek(0)
     return buf.getvalue()
 
@@ -109,22 +148,17 @@ def balanced_palette(colors: List[str], counts: List[int], seed: int, N: int) ->
     This avoids large contiguous blocks (which can look like triangles/wedges).
     """
     rng = np.random.default_rng(int(seed))
-    slots = []
-    for c, k in zip(colors, counts):
-        slots.extend([c]*int(k))
-    if len(slots) < N:
-        slots.extend([colors[0]] * (N - len(slots)))
-    # Balanced interleave: shuffle small chunks and interleave by modulo classes
+    slots = np.repeat(np.array(colors, dtype=object), [max(0, int(k)) for k in counts])
+    if slots.size < N:
+        slots = np.concatenate([slots, np.full(N - slots.size, colors[0], dtype=object)])
+    # Balanced interleave: shuffle, deal into modulo-class buckets, shuffle each
+    # bucket and weave them back -- bucket j owns the output stride out[j::nb]
     rng.shuffle(slots)
-    buckets = [[] for _ in range(min(len(colors), 6))]
-    for i, c in enumerate(slots[:N]):
-        buckets[i % len(buckets)].append(c)
-    out = []
-    for b in buckets:
+    slots = slots[:N]
+    nb = min(len(colors), 6)
+    out = np.empty(slots.size, dtype=object)
+    for j in range(nb):
+        b = slots[j::nb].copy()
         rng.shuffle(b)
-    # weave
-    for i in range(max(len(b) for b in buckets)):
-        for b in buckets:
-            if i < len(b):
-                out.append(b[i])
-    return out[:N]
+        out[j::nb] = b
+    return out.tolist()
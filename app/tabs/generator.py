@@ -2,11 +2,42 @@
 import streamlit as st
 import numpy as np
 import math
+import dataclasses
+import matplotlib
+matplotlib.use("Agg")  # headless; Streamlit only needs rendered pixels
 import matplotlib.pyplot as plt
 from app.hex_tile_layouts_core import (
-    LayoutParams, generate_layout, plot_layout_on_ax, transparent_png_bytes
+    LayoutParams, generate_layout, plot_layout_on_ax, transparent_png_bytes, layout_dims_in
 )
 
+_PARAMS_HASH = {LayoutParams: lambda p: repr(dataclasses.astuple(p))}
+
+@st.cache_data(show_spinner=False, max_entries=128, ttl=24*3600, hash_funcs=_PARAMS_HASH)
+def _build_layout(params: LayoutParams, seed: int):
+    """Layout, colors, transparent PNG and physical size for one seed (pure in params + seed)."""
+    rng = np.random.default_rng(int(seed))
+    hexes, assigned = generate_layout(rng, params)
+    png = transparent_png_bytes(hexes, assigned, params)
+    w_in, h_in = layout_dims_in(hexes, params)
+    return hexes, assigned, png, w_in, h_in
+
+@st.cache_data(show_spinner=False, max_entries=16, ttl=24*3600, hash_funcs=_PARAMS_HASH)
+def _bordered_grid(params: LayoutParams, seed: int, n: int, rows: int, cols: int):
+    """RGBA pixels of the bordered preview grid for n layouts from seed (pure in its inputs)."""
+    # all previews share one figure: a single Agg renderer and one composite
+    fig, axes = plt.subplots(rows, cols, figsize=(6*cols, 5*rows), squeeze=False)
+    for i, ax in enumerate(axes.flat):
+        if i < n:
+            hexes, assigned = _build_layout(params, seed + i)[:2]
+            plot_layout_on_ax(ax, hexes, assigned, params, title=f"Layout #{i+1} (seed={seed+i})")
+        else:
+            ax.axis("off")
+    fig.tight_layout()
+    fig.canvas.draw()
+    rgba = np.array(fig.canvas.buffer_rgba())
+    plt.close(fig)
+    return rgba
+
 def render():
     """Renders the Generator tab."""
     
@@ -74,26 +105,20 @@ def render():
         )
         N = int(layouts)
         cols = int(math.ceil(math.sqrt(N))); rows = int(math.ceil(N/cols))
+        results = [_build_layout(params, int(seed) + i) for i in range(N)]
+        if show_borders:
+            # cached like the layouts, so reruns with unchanged inputs skip the redraw
+            st.image(_bordered_grid(params, int(seed), N, rows, cols))
         grid = [st.columns(cols) for _ in range(rows)]
-        for i in range(N):
+        for i, (hexes, assigned, png, w_in, h_in) in enumerate(results):
             r, c = i // cols, i % cols
-            rng = np.random.default_rng(int(seed) + i)
-            hexes, assigned = generate_layout(rng, params)
-            fig, ax = plt.subplots(figsize=(6,5))
-            w_in, h_in = plot_layout_on_ax(ax, hexes, assigned, params, title=f"Layout #{i+1} (seed={int(seed)+i})")
             ar = w_in / max(1e-6, h_in); target = params.aspect()
             dev = abs(ar - target)/target * 100.0
             with grid[r][c]:
                 st.caption(f"Aspect {ar:.3f} (target {target:.3f}) — dev {dev:.1f}%")
-                png = transparent_png_bytes(hexes, assigned, params)
-                
-                # --- THIS IS THE CORRECTED LOGIC ---
-                if show_borders:
-                    st.pyplot(fig)
-                else:
+                if not show_borders:
                     st.image(png)
-                # --- END OF CORRECTION ---
-                
+
                 st.download_button("Download PNG", data=png, file_name=f"layout_{i+1}_seed_{int(seed)+i}.png", mime="image/png")
                 pattern_key = f"Layout #{i+1} (seed={int(seed)+i})"
-                st.session_state.pattern_objects[pattern_key] = {"png_bytes": png, "width_in": w_in, "height_in": h_in}
\ No newline at end of file
+                st.session_state.pattern_objects[pattern_key] = {"png_bytes": png, "width_in": w_in, "height_in": h_in}
@@ -3,19 +3,99 @@ import streamlit as st
 from streamlit_drawable_canvas import st_canvas
 from PIL import Image
 import io
-import json
 import base64
 
-def resize_image(image_bytes: bytes, max_dimension: int = 800) -> bytes:
-    """Resizes an image to fit within a max dimension, preserving aspect ratio."""
+try:  # optional SIMD encoder (pybase64); identical output to the stdlib
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:
+    def _b64encode_str(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+def _resize_image_with_size(image_bytes: bytes, max_dimension: int = 800) -> tuple[bytes, tuple[int, int]]:
+    """resize_image that also returns the resulting (width, height), so callers never reopen it."""
     img = Image.open(io.BytesIO(image_bytes))
     if max(img.size) > max_dimension:
-        img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        if img.format == "JPEG":
+            # decode at a reduced DCT scale instead of full resolution
+            img.draft("RGB", (max_dimension, max_dimension))
+        # box-reduce first, LANCZOS only for the last <3x step
+        img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=3.0)
         buf = io.BytesIO()
         img_format = img.format if img.format in ['JPEG', 'PNG'] else 'PNG'
-        img.save(buf, format=img_format)
-        return buf.getvalue()
-    return image_bytes
+        if img_format == 'JPEG':
+            img.save(buf, format=img_format, quality=85, optimize=False)
+        else:
+            img.save(buf, format=img_format)
+        return buf.getvalue(), img.size
+    return image_bytes, img.size
+
+def resize_image(image_bytes: bytes, max_dimension: int = 800) -> bytes:
+    """Resizes an image to fit within a max dimension, preserving aspect ratio."""
+    return _resize_image_with_size(image_bytes, max_dimension)[0]
+
+def _canvas_image(image_bytes: bytes, size: tuple[int, int] | None = None) -> dict:
+    """Fabric image fields (data URL + size) for a PNG/JPEG payload; header is parsed only without `size`."""
+    if size is None:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            size = img.size
+    width, height = size
+    src = f"data:image/png;base64,{_b64encode_str(image_bytes)}"
+    return {"src": src, "width": width, "height": height}
+
+
+def _pattern_canvas_image(pattern_data: dict) -> dict:
+    # memoized on the session's pattern entry; regenerating replaces the entry
+    if "canvas_image" not in pattern_data:
+        pattern_data["canvas_image"] = _canvas_image(pattern_data["png_bytes"])
+    return pattern_data["canvas_image"]
+
+
+@st.fragment
+def _overlay_canvas(selected_pattern_data: dict):
+    """Canvas + drag handling; reruns only this fragment while the overlay moves."""
+    bg = st.session_state.bg_canvas_image
+    pattern = _pattern_canvas_image(selected_pattern_data)
+    overlay_state = st.session_state.overlay_state
+    bg_w, bg_h = bg["width"], bg["height"]
+
+    bg_fabric_obj = {"type": "image", **bg, "left": 0, "top": 0, "selectable": False, "evented": False}
+    overlay_fabric_obj = {"type": "image", "src": pattern["src"], **overlay_state, "width": pattern["width"], "height": pattern["height"]}
+
+    st.markdown("Click and drag the overlay to move it. Use the handles to resize.")
+
+    canvas_result = st_canvas(
+        fill_color="rgba(0,0,0,0)", stroke_width=0, update_streamlit=True, height=bg_h, width=bg_w,
+        drawing_mode="transform", initial_drawing={"version": "5.3.0", "objects": [bg_fabric_obj, overlay_fabric_obj]}, key="overlay_canvas"
+    )
+
+    if canvas_result.json_data and canvas_result.json_data.get("objects") and len(canvas_result.json_data["objects"]) > 1:
+        new_state = canvas_result.json_data["objects"][1]
+        # the canvas already shows the move client-side: just persist it (no extra rerun),
+        # and ignore sub-pixel jitter so repeated events do not churn session state
+        if _overlay_moved(overlay_state, new_state):
+            overlay_state.update(new_state)
+
+
+def _overlay_moved(old: dict, new: dict, px: float = 2.0, scale: float = 0.01) -> bool:
+    """True once the overlay moved more than `px` pixels or rescaled by more than `scale`."""
+    return (
+        abs(new.get("left", 0) - old.get("left", 0)) > px
+        or abs(new.get("top", 0) - old.get("top", 0)) > px
+        or abs(new.get("scaleX", 1) - old.get("scaleX", 1)) > scale
+        or abs(new.get("scaleY", 1) - old.get("scaleY", 1)) > scale
+        or new.get("angle", 0) != old.get("angle", 0)
+    )
+
+
+def _initial_overlay_state(bg_size: tuple[int, int], pattern_size: tuple[int, int]) -> dict:
+    """Overlay centred on the wall, scaled so its longest side is half the wall's."""
+    (bg_w, bg_h), (pat_w, pat_h) = bg_size, pattern_size
+    initial_scale = (max(bg_w, bg_h) * 0.50) / max(pat_w, pat_h)
+    return {
+        "left": bg_w / 2 - pat_w / 2, "top": bg_h / 2 - pat_h / 2,
+        "scaleX": initial_scale, "scaleY": initial_scale
+    }
+
 
 def render():
     """Renders the Overlay tab."""
@@ -23,8 +103,12 @@ def render():
     with st.sidebar:
         st.header("Overlay Controls")
         uploaded_file = st.file_uploader("Upload Wall Image", type=["png", "jpg", "jpeg"])
-        if uploaded_file:
-            st.session_state.uploaded_wall_image_bytes = resize_image(uploaded_file.getvalue())
+        # resize once per uploaded file, not on every rerun
+        if uploaded_file and uploaded_file.file_id != st.session_state.get('uploaded_wall_file_id'):
+            wall_bytes, wall_size = _resize_image_with_size(uploaded_file.getvalue())
+            st.session_state.uploaded_wall_image_bytes = wall_bytes
+            st.session_state.uploaded_wall_image_size = wall_size
+            st.session_state.uploaded_wall_file_id = uploaded_file.file_id
 
         pattern_keys = list(st.session_state.get('pattern_objects', {}).keys())
         if not pattern_keys:
@@ -43,49 +127,21 @@ def render():
         st.session_state.uploaded_wall_image_bytes != st.session_state.get('active_wall_image_bytes')):
         
         st.session_state.active_wall_image_bytes = st.session_state.uploaded_wall_image_bytes
+        # encode the wall once per activation; the canvas reuses it on every rerun
+        st.session_state.bg_canvas_image = _canvas_image(
+            st.session_state.active_wall_image_bytes, st.session_state.get('uploaded_wall_image_size')
+        )
         
-        bg_image = Image.open(io.BytesIO(st.session_state.active_wall_image_bytes))
-        pattern_data = st.session_state.pattern_objects[selected_pattern_key]
-        pattern_img = Image.open(io.BytesIO(pattern_data["png_bytes"]))
-        
-        center_x, center_y = bg_image.width / 2, bg_image.height / 2
-        initial_left = center_x - (pattern_img.width / 2)
-        initial_top = center_y - (pattern_img.height / 2)
-        
-        bg_longest = max(bg_image.size); overlay_longest = max(pattern_img.size)
-        initial_scale = (bg_longest * 0.50) / overlay_longest
-        
-        st.session_state.overlay_state = {
-            "left": initial_left, "top": initial_top,
-            "scaleX": initial_scale, "scaleY": initial_scale
-        }
+        bg = st.session_state.bg_canvas_image
+        pattern_img = _pattern_canvas_image(st.session_state.pattern_objects[selected_pattern_key])
+        st.session_state.overlay_state = _initial_overlay_state(
+            (bg["width"], bg["height"]), (pattern_img["width"], pattern_img["height"])
+        )
         st.rerun()
 
     if st.session_state.get('active_wall_image_bytes'):
-        bg_image_bytes = st.session_state.active_wall_image_bytes
-        bg_image = Image.open(io.BytesIO(bg_image_bytes))
         selected_pattern_data = st.session_state.pattern_objects[selected_pattern_key]
-        pattern_img_bytes = selected_pattern_data["png_bytes"]
-        pattern_img = Image.open(io.BytesIO(pattern_img_bytes))
-        overlay_state = st.session_state.overlay_state
-        
-        b64_bg = base64.b64encode(bg_image_bytes).decode("utf-8")
-        bg_fabric_obj = {"type": "image", "src": f"data:image/png;base64,{b64_bg}", "left": 0, "top": 0, "width": bg_image.width, "height": bg_image.height, "selectable": False, "evented": False}
-        b64_pattern = base64.b64encode(pattern_img_bytes).decode("utf-8")
-        overlay_fabric_obj = {"type": "image", "src": f"data:image/png;base64,{b64_pattern}", **overlay_state, "width": pattern_img.width, "height": pattern_img.height}
-        
-        st.markdown("Click and drag the overlay to move it. Use the handles to resize.")
-        
-        canvas_result = st_canvas(
-            fill_color="rgba(0,0,0,0)", stroke_width=0, update_streamlit=True, height=bg_image.height, width=bg_image.width,
-            drawing_mode="transform", initial_drawing={"version": "5.3.0", "objects": [bg_fabric_obj, overlay_fabric_obj]}, key="overlay_canvas"
-        )
-
-        if canvas_result.json_data and canvas_result.json_data.get("objects") and len(canvas_result.json_data["objects"]) > 1:
-            new_state = canvas_result.json_data["objects"][1]
-            if st.session_state.overlay_state != new_state:
-                st.session_state.overlay_state.update(new_state)
-                st.rerun()
+        _overlay_canvas(selected_pattern_data)
 
         # --- THIS IS THE CORRECTED LOGIC ---
         # Display the fixed, physical dimensions of the selected layout, ignoring visual scaling.
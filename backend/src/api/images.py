@@ -16,6 +16,16 @@ router = APIRouter()
     response_model=UploadResponse,
     status_code=status.HTTP_200_OK,
     responses={
+        413: {
+            "description": "Upload exceeds the byte or pixel limit",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Image too large: 10000x10000 pixels (limit 50000000)"
+                    }
+                }
+            },
+        },
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {
             "description": "Unsupported file type",
             "content": {
@@ -59,15 +69,21 @@ async def upload_image(
         )
     
     try:
-        result = await image_service.process_upload(file, max_dimension)
+        record = await image_service.process_upload(file, max_dimension)
         
-        return UploadResponse(
-            image_id=result["image_id"],
-            width=result["width"],
-            height=result["height"],
-            processed_data=result["processed_data"],
-            format=result.get("format"),
-            original_size=result.get("original_size")
+        # Trusted producer: fields come straight from PIL/base64, so skip validating
+        # the (large) processed_data string again (FastAPI does not revalidate
+        # instances)
+        return UploadResponse.model_construct(
+            image_id=record.id,
+            width=record.width,
+            height=record.height,
+            processed_data=image_service.data_url(record),
+            format=record.format,
+            original_size={
+                "width": record.original_width,
+                "height": record.original_height,
+            },
         )
         
     except ValueError as e:
@@ -4,7 +4,9 @@ Handles overlay calculation functionality
 """
 
 from fastapi import APIRouter, HTTPException, status
-from src.models.api_models import OverlayRequest, OverlayResponse
+from src.models.api_models import (
+    OverlayRequest, OverlayResponse, PhysicalDimensions, VisualDimensions
+)
 from src.services.overlay_service import overlay_service
 from src.services.image_service import image_service
 
@@ -71,9 +73,19 @@ async def calculate_overlay(request: OverlayRequest):
         # Calculate dimensions using overlay service
         result = overlay_service.calculate_dimensions(request, image_data)
         
-        return OverlayResponse(
-            physical_dimensions=result["physical_dimensions"],
-            visual_dimensions=result["visual_dimensions"]
+        # Trusted producer: the service returns plain floats, so build the response
+        # without validation (FastAPI does not revalidate returned model instances)
+        physical = result["physical_dimensions"]
+        visual = result["visual_dimensions"]
+        return OverlayResponse.model_construct(
+            physical_dimensions=PhysicalDimensions.model_construct(
+                width_inches=float(physical["width_inches"]),
+                height_inches=float(physical["height_inches"])
+            ),
+            visual_dimensions=VisualDimensions.model_construct(
+                width_px=float(visual["width_px"]),
+                height_px=float(visual["height_px"])
+            )
         )
         
     except HTTPException as e:
@@ -3,19 +3,274 @@ Patterns API endpoints
 Handles pattern generation and download functionality
 """
 
+import asyncio
 import base64
-import uuid
-from typing import Dict
-from fastapi import APIRouter, HTTPException, Response, status
-from src.models.api_models import GenerateRequest, GenerateResponse, Pattern, Hex
-from src.services.pattern_service import generate_layout, LayoutParams, transparent_png_bytes
-from src.services.overlay_service import overlay_service
+import dataclasses
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from src.models.api_models import GenerateRequest, GenerateResponse, Hex, Pattern
+from src.services.pattern_service import (
+    generate_layout, LayoutParams, transparent_png_bytes, hex_coords,
+    full_tile_bbox_from_coords,
+)
+from src.services import registry
+from src.services.registry import PatternRecord
 import numpy as np
 
+try:  # optional SIMD encoder (pybase64); identical output to the stdlib
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:
+    def _b64encode_str(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+try:  # optional binary transport for /generate.msgpack
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
 router = APIRouter()
 
-# In-memory storage for generated patterns (in production, use proper storage)
-_stored_patterns: Dict[str, Dict] = {}
+# Layout growth and matplotlib rendering are pure-Python, GIL-bound work, so the
+# thread pool alone only overlaps them; PATTERN_PROCESSES > 0 hands cache misses to
+# that many worker processes per server worker (opt-in: the default 0 keeps
+# everything in-process).
+_CPUS = os.cpu_count() or 1
+PATTERN_PROCESSES = int(os.getenv("PATTERN_PROCESSES", "0"))
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _layout_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared worker-process pool, created on first use (None when disabled)"""
+    global _process_pool
+    if PATTERN_PROCESSES <= 0:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn, not fork: the server process already runs an event loop and threads
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PATTERN_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def shutdown_layout_pool() -> None:
+    """Stop the worker-process pool, if one was started (app shutdown)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown()
+            _process_pool = None
+
+
+def _params_key(params: LayoutParams) -> tuple:
+    """Hashable, field-ordered key for LayoutParams
+
+    Lists become tuples and the roles dict its sorted items.
+    """
+    key = []
+    for value in dataclasses.astuple(params):
+        if isinstance(value, dict):
+            value = ("__dict__",) + tuple(sorted(value.items()))
+        elif isinstance(value, list):
+            value = tuple(value)
+        key.append(value)
+    return tuple(key)
+
+
+def _params_from_key(params_key: tuple) -> LayoutParams:
+    values = [
+        dict(v[1:]) if isinstance(v, tuple) and v[:1] == ("__dict__",) else v
+        for v in params_key
+    ]
+    return LayoutParams(*values)
+
+
+class LayoutResult(NamedTuple):
+    """Immutable result for one (params, seed), safe to share from the caches"""
+    qr: Tuple[Tuple[int, int], ...]
+    colors: Tuple[str, ...]
+    width_inches: float
+    height_inches: float
+    layout_digest: str  # content address of the layout (pattern id suffix)
+    png_bytes: Optional[bytes]  # None when rendered without the PNG
+    png_digest: Optional[str]  # ETag value of png_bytes
+
+
+@lru_cache(maxsize=512)
+def _generate_one(params_key: tuple, seed: int, with_png: bool = True) -> LayoutResult:
+    """Deterministic layout (+ render when with_png) for one (params, seed)
+
+    Memoized for repeated requests.
+    """
+    pool = _layout_pool()
+    if pool is None:
+        return _render_layout(params_key, seed, with_png)
+    # the calling pool thread just waits (GIL released) while a worker process renders
+    return pool.submit(_render_layout, params_key, seed, with_png).result()
+
+
+def _render_layout(params_key: tuple, seed: int, with_png: bool = True) -> LayoutResult:
+    """Uncached body of _generate_one; top-level so worker processes can run it"""
+    params = _params_from_key(params_key)
+    # Each layout is seeded with its own reported seed (request.seed + i) so it can be
+    # reproduced on its own. default_rng(int) already runs the seed through
+    # SeedSequence hashing, so adjacent seeds give independent PCG64 streams;
+    # SeedSequence.spawn() would tie layout i to (request.seed, i) and break that
+    # per-seed reproducibility.
+    rng = np.random.default_rng(seed)
+    hexes, colors = generate_layout(rng, params)
+    coords = hex_coords(hexes)
+    # one bbox pass over the coordinate array, shared by the render and the dimensions
+    bbox = full_tile_bbox_from_coords(coords, params)
+    qr = tuple(map(tuple, coords.tolist()))
+
+    # Calculate dimensions (simplified from original)
+    min_x, min_y, max_x, max_y = bbox
+    real_R_in = 6.0  # From original code
+    scale = real_R_in / params.radius
+    width_inches = (max_x - min_x) * scale
+    height_inches = (max_y - min_y) * scale
+
+    # The PNG is a pure function of (hexes, colors, radius), so hashing those addresses
+    # the pattern without rendering it; the PNG digest (ETag) is computed once per
+    # render
+    header = b"%r|%s|" % (params.radius, "|".join(colors).encode("ascii"))
+    layout_digest = hashlib.blake2b(
+        header + coords.tobytes(), digest_size=12
+    ).hexdigest()
+    png_bytes = png_digest = None
+    if with_png:
+        png_bytes = transparent_png_bytes(hexes, colors, params, bbox=bbox)
+        png_digest = hashlib.blake2b(png_bytes, digest_size=12).hexdigest()
+    return LayoutResult(
+        qr, tuple(colors), width_inches, height_inches, layout_digest, png_bytes,
+        png_digest,
+    )
+
+
+# Repeat requests get the same cached bytes object back from _generate_one, whose
+# hash is cached and whose equality check is an identity hit, so the base64 text is
+# reused too
+_png_base64 = lru_cache(maxsize=64)(_b64encode_str)
+
+
+@lru_cache(maxsize=64)
+def _hex_models(qr: Tuple[Tuple[int, int], ...]) -> List[Hex]:
+    """Response Hex models for a cached layout, built once (ints by construction)"""
+    return [Hex.model_construct(q=q, r=r) for q, r in qr]
+
+
+def _generate_and_store(
+    request: GenerateRequest, inline: bool = True
+) -> List[Tuple[PatternRecord, Pattern]]:
+    """Generate request.num_layouts patterns and store them for download/overlay
+
+    With inline=False the Pattern's png_data is left empty (no base64 pass); the PNG
+    stays in the registry for /{id}/thumbnail and /{id}/download. With
+    request.include_png=False the PNG is not rendered at all; those endpoints then
+    render it on first use.
+    """
+    # Convert API request to LayoutParams
+    params = LayoutParams(
+        total_tiles=request.total_tiles,
+        radius=request.radius,
+        aspect_w=request.aspect_w,
+        aspect_h=request.aspect_h,
+        tendrils=request.tendrils,
+        tendril_len_min=request.tendril_len_min,
+        tendril_len_max=request.tendril_len_max,
+        tendril_direction_variability=0.25,  # Default from original
+        aspect_adherence=request.aspect_adherence,
+        compactness_bias=0.35,  # Default from original
+        color_mode=request.color_mode,
+        colors=request.colors,
+        counts=request.counts,
+        gradient_order=request.gradient_order,
+        gradient_axis=request.gradient_axis,
+        roles=request.roles,
+    )
+
+    params_key = _params_key(params)
+
+    def _gen_one(i: int):
+        return _generate_one(params_key, request.seed + i, request.include_png)
+
+    # Layouts are independent (own seed and RNG); render them on a thread pool
+    # and store serially afterwards so the registry is only touched here
+    workers = max(1, min(request.num_layouts, max(_CPUS, PATTERN_PROCESSES)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        layouts = list(executor.map(_gen_one, range(request.num_layouts)))
+
+    # Calculate aspect ratios and deviations for the whole batch at once
+    dims = np.array([(layout.width_inches, layout.height_inches) for layout in layouts],
+                    dtype=np.float64).reshape(-1, 2)
+    widths, heights = dims[:, 0], dims[:, 1]
+    ratios = np.divide(widths, heights, out=np.ones_like(widths), where=heights > 0)
+    target_ratio = params.aspect()
+    deviations = np.abs(ratios - target_ratio) / target_ratio * 100.0
+
+    results = []
+    for i, result in enumerate(layouts):
+        seed = request.seed + i
+        png_bytes = result.png_bytes
+        png_base64 = _png_base64(png_bytes) if inline and png_bytes is not None else ""
+        colors = list(result.colors)
+        width_inches, height_inches = float(widths[i]), float(heights[i])
+        actual_ratio, deviation = float(ratios[i]), float(deviations[i])
+
+        # Content-addressed id: the seed keeps ids unique within a batch, the layout
+        # digest makes a repeated request map onto the entry it already stored
+        pattern_id = f"pattern_{seed}_{result.layout_digest}"
+
+        record = PatternRecord(
+            id=pattern_id,
+            seed=seed,
+            width_inches=width_inches,
+            height_inches=height_inches,
+            aspect_ratio=actual_ratio,
+            aspect_deviation=deviation,
+            hexes=result.qr,
+            colors=colors,
+            png_bytes=png_bytes,  # Store for download (None: rendered on first use)
+            etag=f'"{result.png_digest}"' if png_bytes is not None else None,
+            params_key=params_key,
+        )
+
+        # Create API response pattern; every field was just computed here, so skip
+        # Pydantic validation (model_construct) on this per-layout hot path
+        pattern = Pattern.model_construct(
+            id=pattern_id,
+            seed=seed,
+            width_inches=width_inches,
+            height_inches=height_inches,
+            aspect_ratio=actual_ratio,
+            aspect_deviation=deviation,
+            png_data=png_base64,
+            hexes=_hex_models(result.qr),
+            colors=colors
+        )
+        results.append((record, pattern))
+
+    for record, _ in results:
+        # Always store the fresh record: the id only addresses the layout, so the same
+        # entry can come back for another target aspect (aspect_deviation differs).
+        # A PNG rendered for the stored entry is the same image, so keep it rather than
+        # rendering it again on download
+        stored = registry.get_pattern(record.id)
+        if stored is not None and record.png_bytes is None and stored.png_bytes:
+            record = dataclasses.replace(
+                record, png_bytes=stored.png_bytes, etag=stored.etag
+            )
+        registry.store_pattern(record)
+    return results
 
 
 @router.post(
@@ -49,89 +304,25 @@ _stored_patterns: Dict[str, Dict] = {}
         },
     },
 )
-async def generate_patterns(request: GenerateRequest):
+async def generate_patterns(
+    request: GenerateRequest,
+    inline: bool = Query(
+        default=True,
+        description=(
+            "Embed base64 png_data; false returns metadata only "
+            "(fetch /{id}/thumbnail)"
+        ),
+    ),
+):
     """Generate hexagonal tile patterns based on configuration parameters"""
     try:
-        # Convert API request to LayoutParams
-        params = LayoutParams(
-            total_tiles=request.total_tiles,
-            radius=request.radius,
-            aspect_w=request.aspect_w,
-            aspect_h=request.aspect_h,
-            tendrils=request.tendrils,
-            tendril_len_min=request.tendril_len_min,
-            tendril_len_max=request.tendril_len_max,
-            tendril_direction_variability=0.25,  # Default from original
-            aspect_adherence=request.aspect_adherence,
-            compactness_bias=0.35,  # Default from original
-            color_mode=request.color_mode,
-            colors=request.colors,
-            counts=request.counts,
-            gradient_order=request.gradient_order,
-            gradient_axis=request.gradient_axis,
-            roles=request.roles,
+        # CPU-bound (layout growth, rendering): keep it off the event loop so concurrent
+        # requests and cheap endpoints are still served meanwhile
+        results = await asyncio.to_thread(_generate_and_store, request, inline)
+        return GenerateResponse.model_construct(
+            patterns=[pattern for _, pattern in results]
         )
         
-        patterns = []
-        
-        # Generate requested number of layouts
-        for i in range(request.num_layouts):
-            rng = np.random.default_rng(request.seed + i)
-            hexes, colors = generate_layout(rng, params)
-            
-            # Generate PNG data
-            png_bytes = transparent_png_bytes(hexes, colors, params)
-            png_base64 = base64.b64encode(png_bytes).decode('utf-8')
-            
-            # Calculate dimensions (simplified from original)
-            from src.services.pattern_service import full_tile_bbox
-            min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params)
-            real_R_in = 6.0  # From original code
-            scale = real_R_in / params.radius
-            width_inches = (max_x - min_x) * scale
-            height_inches = (max_y - min_y) * scale
-            
-            # Calculate aspect ratio and deviation
-            actual_ratio = width_inches / height_inches if height_inches > 0 else 1.0
-            target_ratio = params.aspect()
-            deviation = abs(actual_ratio - target_ratio) / target_ratio * 100.0
-            
-            # Create pattern ID and store pattern
-            pattern_id = f"pattern_{request.seed + i}_{i}"
-            
-            pattern_data = {
-                "id": pattern_id,
-                "seed": request.seed + i,
-                "width_inches": width_inches,
-                "height_inches": height_inches,
-                "aspect_ratio": actual_ratio,
-                "aspect_deviation": deviation,
-                "png_data": png_base64,
-                "hexes": [{"q": h.q, "r": h.r} for h in hexes],
-                "colors": colors,
-                "png_bytes": png_bytes  # Store for download
-            }
-            
-            # Store pattern for download and overlay calculations
-            _stored_patterns[pattern_id] = pattern_data
-            overlay_service.store_pattern(pattern_id, pattern_data)
-            
-            # Create API response pattern
-            pattern = Pattern(
-                id=pattern_id,
-                seed=request.seed + i,
-                width_inches=width_inches,
-                height_inches=height_inches,
-                aspect_ratio=actual_ratio,
-                aspect_deviation=deviation,
-                png_data=png_base64,
-                hexes=[Hex(q=h.q, r=h.r) for h in hexes],
-                colors=colors
-            )
-            patterns.append(pattern)
-        
-        return GenerateResponse(patterns=patterns)
-        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
@@ -139,37 +330,132 @@ async def generate_patterns(request: GenerateRequest):
         )
 
 
-@router.get(
-    "/{pattern_id}/download",
+@router.post(
+    "/generate.msgpack",
     response_class=Response,
+    status_code=status.HTTP_200_OK,
     responses={
         status.HTTP_200_OK: {
-            "description": "Pattern PNG file",
-            "content": {"image/png": {}},
+            "description": (
+                "Generated patterns as MessagePack "
+                "(raw PNG bytes, int32 (N, 2) hex array)"
+            ),
+            "content": {"application/msgpack": {}},
         },
-        status.HTTP_404_NOT_FOUND: {
-            "description": "Pattern not found",
-            "content": {
-                "application/json": {
-                    "example": {"detail": "Pattern not found: pattern_123"}
-                }
-            },
+        status.HTTP_501_NOT_IMPLEMENTED: {
+            "description": "MessagePack support (ormsgpack) is not installed",
         },
     },
 )
-async def download_pattern(pattern_id: str):
-    """Download pattern as PNG file"""
-    if pattern_id not in _stored_patterns:
+async def generate_patterns_msgpack(request: GenerateRequest):
+    """Binary variant of /generate: no base64 and no JSON for the hex coordinates"""
+    if ormsgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="MessagePack responses require the optional 'ormsgpack' package"
+        )
+    try:
+        results = await asyncio.to_thread(_generate_and_store, request, False)
+        payload = {"patterns": [
+            {
+                "id": record.id,
+                "seed": record.seed,
+                "width_inches": record.width_inches,
+                "height_inches": record.height_inches,
+                "aspect_ratio": record.aspect_ratio,
+                "aspect_deviation": record.aspect_deviation,
+                "png": record.png_bytes,
+                "hexes": np.array(record.hexes, dtype=np.int32).reshape(-1, 2),
+                "colors": record.colors,
+            }
+            for record, _ in results
+        ]}
+        return Response(
+            content=ormsgpack.packb(payload, option=ormsgpack.OPT_SERIALIZE_NUMPY),
+            media_type="application/msgpack"
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Pattern generation failed: {str(e)}"
+        )
+
+
+async def _png_response(
+    pattern_id: str, if_none_match: Optional[str], disposition: str
+) -> Response:
+    """Stored PNG for pattern_id as raw image/png, honouring If-None-Match"""
+    pattern = registry.get_pattern(pattern_id)
+    if pattern is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail=f"Pattern not found: {pattern_id}"
         )
     
-    pattern = _stored_patterns[pattern_id]
-    png_bytes = pattern["png_bytes"]
+    if pattern.png_bytes is None:
+        # Generated with include_png=false: render now (memoized) and keep it on the
+        # record
+        result = await asyncio.to_thread(
+            _generate_one, pattern.params_key, pattern.seed, True
+        )
+        pattern.png_bytes = result.png_bytes
+        pattern.etag = f'"{result.png_digest}"'
+    
+    # ETag is the PNG's content digest; entries can still be evicted, so clients
+    # revalidate instead of caching forever
+    etag = pattern.etag
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in [t.strip() for t in if_none_match.split(",")]
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
     
     return Response(
-        content=png_bytes,
+        content=pattern.png_bytes,
         media_type="image/png",
-        headers={"Content-Disposition": f"attachment; filename={pattern_id}.png"}
-    )
\ No newline at end of file
+        headers={
+            "Content-Disposition": f"{disposition}; filename={pattern_id}.png",
+            **cache_headers,
+        },
+    )
+
+
+_PNG_RESPONSES = {
+    status.HTTP_200_OK: {
+        "description": "Pattern PNG file",
+        "content": {"image/png": {}},
+    },
+    status.HTTP_304_NOT_MODIFIED: {
+        "description": "Pattern PNG unchanged since the ETag in If-None-Match",
+    },
+    status.HTTP_404_NOT_FOUND: {
+        "description": "Pattern not found",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Pattern not found: pattern_123"}
+            }
+        },
+    },
+}
+
+
+@router.get(
+    "/{pattern_id}/download", response_class=Response, responses=_PNG_RESPONSES
+)
+async def download_pattern(
+    pattern_id: str, if_none_match: Optional[str] = Header(default=None)
+):
+    """Download pattern as PNG file"""
+    return await _png_response(pattern_id, if_none_match, "attachment")
+
+
+@router.get(
+    "/{pattern_id}/thumbnail", response_class=Response, responses=_PNG_RESPONSES
+)
+async def pattern_thumbnail(
+    pattern_id: str, if_none_match: Optional[str] = Header(default=None)
+):
+    """Pattern PNG for display (same bytes as download, served inline)"""
+    return await _png_response(pattern_id, if_none_match, "inline")
@@ -4,13 +4,18 @@ FastAPI backend for Hex Layout Toolkit
 Provides REST API endpoints for pattern generation and overlay visualization
 """
 
+import json
 import os
 import re
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 from src.api import images, overlay, patterns
+from src.services import image_service
 
 
 DEFAULT_ALLOWED_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -43,20 +48,65 @@ def _get_allowed_origin_regex() -> str | None:
     return configured_regex
 
 
+class UploadSizeLimitMiddleware:
+    """Reject bodies whose Content-Length exceeds MAX_UPLOAD_BYTES before they are read
+
+    Plain ASGI (no BaseHTTPMiddleware wrapping); chunked bodies without a length fall
+    through to the size check in ImageService.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    limit = image_service.MAX_UPLOAD_BYTES
+                    if value.isdigit() and int(value) > limit:
+                        detail = f"Request body too large (limit {limit} bytes)"
+                        response = JSONResponse(
+                            status_code=413, content={"detail": detail}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Worker processes (PATTERN_PROCESSES) must not outlive the app, e.g. across reloads
+    patterns.shutdown_layout_pool()
+
+
 app = FastAPI(
     title="Hex Layout Toolkit API",
     description="REST API for generating hexagonal tile layouts with interactive visualization",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
-# Enable CORS for React frontend
+# Innermost, so its 413 still passes through CORS on the way out
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Compress large JSON bodies (generate responses are mostly base64 PNG text); small
+# ones such as /api/health stay under the threshold. Added before CORS so the CORS
+# middleware is outermost and its headers wrap the compressed response.
+app.add_middleware(GZipMiddleware, minimum_size=2048, compresslevel=5)
+
+# Enable CORS for React frontend. Outermost, so preflights are answered before any
+# other middleware or routing; only the methods/headers the API uses are allowed
+# (no "*" echo path) and browsers may cache the preflight for a day.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_get_allowed_origins(),
     allow_origin_regex=_get_allowed_origin_regex(),
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization", "if-none-match"],
+    max_age=86400,
 )
 
 # Include API routers
@@ -65,15 +115,40 @@ app.include_router(images.router, prefix="/api/images", tags=["images"])
 app.include_router(overlay.router, prefix="/api/overlay", tags=["overlay"])
 
 
-@app.get("/")
+# The routers' response models keep their JSON endpoints on FastAPI's Pydantic
+# dump_json path (bytes straight from the Rust core); a custom default_response_class
+# such as ORJSONResponse would opt routes out of that path. The two constant
+# endpoints below (also hit by liveness probes) skip serialization entirely.
+_ROOT_BODY = json.dumps(
+    {"message": "Hex Layout Toolkit API", "version": "2.0.0", "docs": "/docs"}
+).encode()
+_HEALTH_BODY = json.dumps({"status": "healthy"}).encode()
+
+
+@app.get("/", response_class=Response)
 async def root():
-    return {"message": "Hex Layout Toolkit API", "version": "2.0.0", "docs": "/docs"}
+    return Response(_ROOT_BODY, media_type="application/json")
 
 
-@app.get("/api/health")
+@app.get("/api/health", response_class=Response)
 async def health_check():
-    return {"status": "healthy"}
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # Local development entry point: reload stays on (UVICORN_RELOAD=0 turns it off).
+    # loop/http "auto" pick uvloop + httptools when installed (uvicorn[standard]) and
+    # fall back to asyncio/h11 elsewhere, e.g. on Windows.
+    # WEB_CONCURRENCY defaults to 1: generated patterns and uploads live in process
+    # memory, so extra workers only help once that state moves to shared storage
+    # (downloads/overlays would otherwise miss ids stored by a sibling process).
+    reload = os.getenv("UVICORN_RELOAD", "1").lower() not in ("0", "false")
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        reload=reload,
+        workers=1 if reload else int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
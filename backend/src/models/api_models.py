@@ -4,10 +4,13 @@ Defines the data structures for the Hex Layout Toolkit API
 """
 
 from typing import List, Dict, Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 import re
 
 
+_HEX_COLOR_MATCH = re.compile(r'^#[0-9A-Fa-f]{6}$').match
+
+
 class Hex(BaseModel):
     """Hexagonal grid coordinate in axial coordinate system"""
     q: int = Field(..., description="Horizontal axis coordinate")
@@ -41,14 +44,21 @@ class GenerateRequest(BaseModel):
     radius: float = Field(default=1.0, ge=0.6, le=2.0, description="Hexagon visual radius")
     seed: int = Field(..., ge=0, le=1000000000, description="Random number seed for reproducibility")
     num_layouts: int = Field(..., ge=1, le=12, description="Number of pattern variations to generate")
-
+    include_png: bool = Field(
+        default=True,
+        description=(
+            "Render PNGs now; false skips rendering "
+            "(png_data is empty, download renders on demand)"
+        ),
+    )
+
+    # Field validators keep each error's loc on its field (["body", "colors"], ...)
     @field_validator('colors')
     @classmethod
     def validate_hex_colors(cls, v):
-        hex_pattern = re.compile(r'^#[0-9A-Fa-f]{6}$')
-        for color in v:
-            if not hex_pattern.match(color):
-                raise ValueError(f'Invalid hex color: {color}. Must be in format #RRGGBB')
+        if not all(map(_HEX_COLOR_MATCH, v)):
+            color = next(c for c in v if not _HEX_COLOR_MATCH(c))
+            raise ValueError(f'Invalid hex color: {color}. Must be in format #RRGGBB')
         return v
 
     @field_validator('counts')
@@ -65,11 +75,15 @@ class GenerateRequest(BaseModel):
             raise ValueError('tendril_len_max must be >= tendril_len_min')
         return v
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        # Validate that counts sum to total_tiles
-        if sum(self.counts) != self.total_tiles:
-            raise ValueError(f'Sum of counts ({sum(self.counts)}) must equal total_tiles ({self.total_tiles})')
+    @model_validator(mode='after')
+    def validate_counts_sum(self):
+        # Validate that counts sum to total_tiles (summed once)
+        total = sum(self.counts)
+        if total != self.total_tiles:
+            raise ValueError(
+                f'Sum of counts ({total}) must equal total_tiles ({self.total_tiles})'
+            )
+        return self
 
 
 class Pattern(BaseModel):
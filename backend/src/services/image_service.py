@@ -3,22 +3,35 @@ Image processing service for the Hex Layout Toolkit
 Handles image upload, resizing, and format conversion
 """
 
+import asyncio
 import io
-import base64
+import os
 import uuid
-from typing import Tuple, Dict
+from typing import Tuple
 from PIL import Image
 from fastapi import UploadFile, HTTPException
+from src.services import registry
+from src.services.registry import ImageRecord
+
+try:  # optional SIMD encoder (pybase64); identical output to the stdlib
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+# Upload limits, checked before any pixel is decoded (413 instead of a huge raster).
+# MAX_UPLOAD_PIXELS is the decompression-bomb guard: it is compared against the header
+# size, so Pillow's process-wide Image.MAX_IMAGE_PIXELS is left at its default.
+# Bytes are also enforced from Content-Length by the middleware in main.py.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_UPLOAD_PIXELS = int(os.getenv("MAX_UPLOAD_PIXELS", "50000000"))
 
 
 class ImageService:
     """Service for processing uploaded images"""
     
-    def __init__(self):
-        # In-memory storage for uploaded images (in production, use proper storage)
-        self._images: Dict[str, Dict] = {}
-    
-    async def process_upload(self, file: UploadFile, max_dimension: int = 800) -> Dict:
+    async def process_upload(
+        self, file: UploadFile, max_dimension: int = 800
+    ) -> ImageRecord:
         """
         Process an uploaded image file
         
@@ -27,57 +40,17 @@ class ImageService:
             max_dimension: Maximum dimension for resizing
             
         Returns:
-            Dict containing image metadata and processed data
+            The stored ImageRecord (encoded bytes + metadata)
         """
         if not file.content_type or not file.content_type.startswith('image/'):
             raise ValueError("Unsupported file type. Must be an image.")
         
         try:
-            # Read the uploaded file
-            contents = await file.read()
-            if len(contents) == 0:
-                raise ValueError("Empty file uploaded")
-            
-            # Open the image with PIL
-            image = Image.open(io.BytesIO(contents))
-            original_width, original_height = image.size
-            original_format = image.format or 'PNG'
-            
-            # Resize if necessary
-            processed_image = self._resize_image(image, max_dimension)
-            
-            # Convert to base64 for storage/transmission
-            processed_data = self._image_to_base64(processed_image)
-            
-            # Generate unique ID
-            image_id = str(uuid.uuid4())
-            
-            # Store image metadata
-            image_metadata = {
-                'id': image_id,
-                'width': processed_image.width,
-                'height': processed_image.height,
-                'format': processed_image.format or 'PNG',
-                'processed_data': processed_data,
-                'original_size': {
-                    'width': original_width,
-                    'height': original_height
-                }
-            }
-            
-            self._images[image_id] = image_metadata
-            
-            return {
-                'image_id': image_id,
-                'width': processed_image.width,
-                'height': processed_image.height,
-                'processed_data': processed_data,
-                'format': processed_image.format or 'PNG',
-                'original_size': {
-                    'width': original_width,
-                    'height': original_height
-                }
-            }
+            # PIL decode/resize/encode is CPU-bound: run it on a worker thread so the
+            # event loop keeps serving other requests meanwhile
+            return await asyncio.to_thread(
+                self._decode_resize_encode, file, max_dimension
+            )
             
         except ValueError:
             # Re-raise validation errors as-is
@@ -89,42 +62,116 @@ class ImageService:
             # Convert other exceptions to ValueError for proper API error handling
             raise ValueError(f"Failed to process image: {str(e)}")
     
-    def get_image(self, image_id: str) -> Dict:
-        """Get image metadata by ID"""
-        if image_id not in self._images:
-            raise HTTPException(status_code=404, detail="Image not found")
-        return self._images[image_id]
-    
-    def _resize_image(self, image: Image.Image, max_dimension: int) -> Image.Image:
-        """Resize image while preserving aspect ratio"""
-        width, height = image.size
+    def _decode_resize_encode(
+        self, file: UploadFile, max_dimension: int
+    ) -> ImageRecord:
+        """Synchronous part of process_upload: decode, resize, encode and store"""
+        # Decode straight from the spooled upload instead of copying it into memory
+        upload = file.file
+        size = file.size
+        if size is None:  # UploadFile built without a size: measure the spool
+            size = upload.seek(0, io.SEEK_END)
+        if size == 0:
+            raise ValueError("Empty file uploaded")
+        if size > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large: {size} bytes (limit {MAX_UPLOAD_BYTES})"
+            )
+        upload.seek(0)
         
-        if max(width, height) <= max_dimension:
-            return image
+        # Open the image with PIL (header only; pixels load lazily)
+        image = Image.open(upload)
+        original_width, original_height = image.size
+        if original_width * original_height > MAX_UPLOAD_PIXELS:
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"Image too large: {original_width}x{original_height} pixels "
+                    f"(limit {MAX_UPLOAD_PIXELS})"
+                ),
+            )
+        original_format = image.format or 'PNG'
+        if max(original_width, original_height) > max_dimension:
+            # JPEG: decode at the smallest DCT scale (1/2, 1/4, 1/8) that still covers
+            # the final size. draft() needs both sides to fit, so ask for the
+            # aspect-correct target: a square box would keep e.g. a 1600x1200 photo at
+            # full scale.
+            scale = max_dimension / max(original_width, original_height)
+            target = (max(1, int(original_width * scale)),
+                      max(1, int(original_height * scale)))
+            image.draft(image.mode, target)
         
-        # Calculate new dimensions while preserving aspect ratio
-        if width > height:
-            new_width = max_dimension
-            new_height = int(height * (max_dimension / width))
-        else:
-            new_height = max_dimension
-            new_width = int(width * (max_dimension / height))
+        # Resize if necessary
+        processed_image = self._resize_image(image, max_dimension)
         
-        return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Encode once and store one record: raw bytes in the registry, base64 only
+        # when the API layer builds its response
+        output_format = self._output_format(processed_image, original_format)
+        record = ImageRecord(
+            # 32 hex chars, same 122 random bits as the hyphenated form; the id is the
+            # only handle on an upload, so it stays unguessable rather than a counter
+            id=uuid.uuid4().hex,
+            width=processed_image.width,
+            height=processed_image.height,
+            format=output_format,
+            data=self._encode_image(processed_image, output_format),
+            original_width=original_width,
+            original_height=original_height,
+        )
+        registry.store_image(record)
+        return record
     
-    def _image_to_base64(self, image: Image.Image) -> str:
-        """Convert PIL Image to base64 data URL"""
+    def get_image(self, image_id: str) -> ImageRecord:
+        """Get image record by ID"""
+        record = registry.get_image(image_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        return record
+    
+    def get_data_url(self, image_id: str) -> str:
+        """Base64 data URL of a stored processed image, encoded on demand"""
+        return self.data_url(self.get_image(image_id))
+    
+    def data_url(self, record: ImageRecord) -> str:
+        """Base64 data URL for a record (prefixed as bytes, decoded to str once)"""
+        mime_type = f"image/{record.format.lower()}"
+        prefix = b"data:%s;base64," % mime_type.encode('ascii')
+        return (prefix + b64encode(record.data)).decode('ascii')
+    
+    def _resize_image(self, image: Image.Image, max_dimension: int) -> Image.Image:
+        """Downscale in place so the longer side is max_dimension
+
+        Aspect is preserved and the image is never upscaled.
+        """
+        # thumbnail() picks the aspect-preserving size; its own draft() is a no-op after
+        # the one in _decode_resize_encode, then it BOX-reduces by an integer factor
+        # first so LANCZOS only runs on the last <3x step
+        image.thumbnail(
+            (max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=3.0
+        )
+        return image
+    
+    def _output_format(self, image: Image.Image, original_format: str) -> str:
+        """JPEG inputs stay JPEG (photographic, no alpha); everything else is PNG.
+
+        Passed explicitly because image.format is None after resize().
+        """
+        if original_format == 'JPEG' and image.mode in ('RGB', 'L'):
+            return 'JPEG'
+        return 'PNG'
+    
+    def _encode_image(self, image: Image.Image, format: str = 'PNG') -> bytes:
+        """Encode a PIL Image to PNG/JPEG bytes"""
         buffer = io.BytesIO()
-        format = image.format or 'PNG'
-        image.save(buffer, format=format)
-        buffer.seek(0)
-        
-        image_data = buffer.getvalue()
-        base64_data = base64.b64encode(image_data).decode('utf-8')
-        
-        # Create data URL
-        mime_type = f"image/{format.lower()}"
-        return f"data:{mime_type};base64,{base64_data}"
+        if format == 'JPEG':
+            # only the processed preview is served to clients, so q85 is plenty
+            image.save(buffer, format=format, quality=85, optimize=False)
+        else:
+            # zlib level 1: several times faster than the default 6 for a slightly
+            # larger file
+            image.save(buffer, format=format, compress_level=1, optimize=False)
+        return buffer.getvalue()
 
 
 # Global instance
@@ -6,20 +6,16 @@ Handles overlay dimension calculations and positioning
 from typing import Dict
 from fastapi import HTTPException
 from src.models.api_models import OverlayRequest, PhysicalDimensions, VisualDimensions
+from src.services import registry
+from src.services.registry import ImageRecord
 
 
 class OverlayService:
     """Service for calculating overlay dimensions"""
     
-    def __init__(self):
-        # In-memory storage for patterns and images (references to other services)
-        self._patterns: Dict[str, Dict] = {}
-    
-    def store_pattern(self, pattern_id: str, pattern_data: Dict):
-        """Store pattern data for overlay calculations"""
-        self._patterns[pattern_id] = pattern_data
-    
-    def calculate_dimensions(self, request: OverlayRequest, image_data: Dict) -> Dict:
+    def calculate_dimensions(
+        self, request: OverlayRequest, image_data: ImageRecord
+    ) -> Dict:
         """
         Calculate physical and visual dimensions for overlay positioning
         
@@ -30,15 +26,14 @@ class OverlayService:
         Returns:
             Dict containing physical and visual dimensions
         """
-        # Get pattern data
-        if request.pattern_id not in self._patterns:
+        # Get pattern data (shared registry record, no per-service copy)
+        pattern = registry.get_pattern(request.pattern_id)
+        if pattern is None:
             raise HTTPException(status_code=400, detail=f"Pattern not found: {request.pattern_id}")
         
-        pattern = self._patterns[request.pattern_id]
-        
         # Calculate physical dimensions (these don't change with overlay transforms)
-        physical_width = pattern["width_inches"]
-        physical_height = pattern["height_inches"]
+        physical_width = pattern.width_inches
+        physical_height = pattern.height_inches
         
         # Calculate visual dimensions based on overlay transform
         # Base visual size (before scaling)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple, Dict, Set, Optional
 
 import io
 import numpy as np
@@ -11,6 +11,8 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
 from matplotlib.patches import RegularPolygon
 from PIL import Image
 
@@ -35,6 +37,11 @@ def axial_to_pixel(h: Hex, R: float) -> Tuple[float, float]:
     y = R * (math.sqrt(3)/2 * h.q + math.sqrt(3) * h.r)
     return x, y
 
+def hex_coords(hexes: List[Hex]) -> np.ndarray:
+    """(N, 2) int32 array of axial (q, r) coordinates, filled in one pass."""
+    return np.fromiter(((h.q, h.r) for h in hexes), dtype=np.dtype((np.int32, 2)),
+                       count=len(hexes))
+
 # -------------------------------
 # Params (v2 semantics; N colors)
 # -------------------------------
@@ -73,10 +80,23 @@ def bounds_px(hexes: Set[Hex], R: float) -> Tuple[float, float, float, float]:
     return min(xs), min(ys), max(xs), max(ys)
 
 def full_tile_bbox(hexes: List[Hex], params: LayoutParams) -> Tuple[float, float, float, float]:
-    xs, ys = zip(*(axial_to_pixel(h, params.radius) for h in hexes))
-    dx = (math.sqrt(3) / 2.0) * params.radius
-    dy = 1.0 * params.radius
-    return min(xs)-dx, min(ys)-dy, max(xs)+dx, max(ys)+dy
+    return full_tile_bbox_from_coords(hex_coords(hexes), params)
+
+def full_tile_bbox_from_coords(
+    qr: np.ndarray, params: LayoutParams
+) -> Tuple[float, float, float, float]:
+    """full_tile_bbox over an (N, 2) axial array in one vectorized pass.
+
+    Same arithmetic as axial_to_pixel.
+    """
+    radius = params.radius
+    q, r = qr[:, 0], qr[:, 1]
+    xs = radius * (1.5 * q)
+    ys = radius * (math.sqrt(3)/2 * q + math.sqrt(3) * r)
+    dx = (math.sqrt(3) / 2.0) * radius
+    dy = 1.0 * radius
+    return (float(xs.min()) - dx, float(ys.min()) - dy,
+            float(xs.max()) + dx, float(ys.max()) + dy)
 
 def aspect_ratio_from_hexes(hexes: Set[Hex], params: LayoutParams) -> float:
     if not hexes:
@@ -117,21 +137,70 @@ def candidate_score(hexes: Set[Hex], candidate: Hex, params: LayoutParams) -> fl
     w_compact = params.compactness_bias * (1.0 - w_aspect)
     return 1e-6 + (w_aspect * aspect_term + w_compact * compact_term)
 
+# Array forms of the scoring above. The growth loops keep a running pixel bbox of S
+# (x0, y0, x1, y1 over tile centres), so scoring every candidate is one NumPy pass
+# instead of rebuilding and rescanning S | {c} per candidate.
+def hex_pixels(hexes: List[Hex], radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Pixel centres for a list of hexes (same arithmetic as axial_to_pixel)."""
+    qr = hex_coords(hexes)
+    q, r = qr[:, 0], qr[:, 1]
+    return radius * (1.5 * q), radius * (math.sqrt(3)/2 * q + math.sqrt(3) * r)
+
+def _extend_bbox(bbox: Tuple[float, float, float, float], x: float,
+                 y: float) -> Tuple[float, float, float, float]:
+    x0, y0, x1, y1 = bbox
+    return min(x0, x), min(y0, y), max(x1, x), max(y1, y)
+
+def aspect_error_with(bbox: Tuple[float, float, float, float], x: float, y: float,
+                      params: LayoutParams) -> float:
+    """aspect_error of S | {c} from S's centre bbox and c's pixel centre."""
+    x0, y0, x1, y1 = _extend_bbox(bbox, x, y)
+    w = (x1 - x0) + 2 * (math.sqrt(3) / 2.0) * params.radius
+    h = (y1 - y0) + 2 * params.radius
+    return aspect_error(max(1e-6, w / h), params.aspect())
+
+def candidate_scores(
+    bbox: Tuple[float, float, float, float], xs: np.ndarray, ys: np.ndarray,
+    params: LayoutParams,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """candidate_score and aspect error for every candidate centre (xs[i], ys[i])."""
+    x0, y0, x1, y1 = bbox
+    dx = (math.sqrt(3) / 2.0) * params.radius
+    dy = 1.0 * params.radius
+    width = (np.maximum(x1, xs) - np.minimum(x0, xs)) + 2*dx
+    height = (np.maximum(y1, ys) - np.minimum(y0, ys)) + 2*dy
+
+    # log/exp stay scalar (libm, as in candidate_score): NumPy's SIMD transcendentals
+    # can differ in the last ulp, which is enough to flip a seeded rng.choice
+    target = params.aspect()
+    k = 4.0 + 18.0 * params.aspect_adherence  # penalty steepness
+    ratio = np.maximum(1e-6, width / height).tolist()
+    err = np.fromiter((aspect_error(r, target) for r in ratio), float, count=len(ratio))
+    aspect_term = np.fromiter((math.exp(-k * e * e) for e in err.tolist()), float,
+                              count=len(ratio))
+
+    area = width * height
+    compact_term = 1.0 / (1.0 + area / (params.radius * params.radius * max(1, params.total_tiles)))
+
+    w_aspect = 0.65 + 0.30 * params.aspect_adherence
+    w_compact = params.compactness_bias * (1.0 - w_aspect)
+    return 1e-6 + (w_aspect * aspect_term + w_compact * compact_term), err
+
 def grow_blob(n: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex]:
     S: Set[Hex] = {Hex(0, 0)}
     frontier: Set[Hex] = set(S.pop().neighbors()); S.add(Hex(0, 0))
+    bbox = (0.0, 0.0, 0.0, 0.0)  # centre bbox of S
 
     tol_log = (0.40 - 0.33 * params.aspect_adherence)  # loose..strict
 
     while len(S) < n and frontier:
         candidates = list(frontier)
-        scores = np.array([candidate_score(S, c, params) for c in candidates], float)
+        xs, ys = hex_pixels(candidates, params.radius)
+        scores, errs = candidate_scores(bbox, xs, ys, params)
 
         # Downweight candidates that exceed aspect tolerance
         if len(S) > 3:
-            errs = [aspect_error(aspect_ratio_from_hexes(S | {c}, params), params.aspect()) for c in candidates]
-            mask = np.array([1.0 if e <= tol_log else 0.10 for e in errs])
-            scores = scores * mask
+            scores = scores * np.where(errs <= tol_log, 1.0, 0.10)
 
         if np.all(scores == 0):
             probs = np.ones_like(scores) / len(scores)
@@ -139,8 +208,10 @@ def grow_blob(n: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex
             scores = scores - scores.max()
             probs = np.exp(scores); probs /= probs.sum()
 
-        chosen = candidates[int(rng.choice(len(candidates), p=probs))]
+        i = int(rng.choice(len(candidates), p=probs))
+        chosen = candidates[i]
         S.add(chosen); frontier.remove(chosen)
+        bbox = _extend_bbox(bbox, float(xs[i]), float(ys[i]))
         for nb in chosen.neighbors():
             if nb not in S:
                 frontier.add(nb)
@@ -148,19 +219,18 @@ def grow_blob(n: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex
     # fill if undershoot
     while len(S) < n:
         ring: List[Hex] = []
+        seen: Set[Hex] = set()
         for h in list(S):
             for nb in h.neighbors():
-                if nb not in S and nb not in ring:
-                    ring.append(nb)
+                if nb not in S and nb not in seen:
+                    seen.add(nb); ring.append(nb)
         if not ring:
             break
-        best, best_sc = None, -1.0
-        for c in ring:
-            sc = candidate_score(S, c, params)
-            if sc > best_sc:
-                best, best_sc = c, sc
-        if best is None: break
-        S.add(best)
+        xs, ys = hex_pixels(ring, params.radius)
+        # first best, as before
+        i = int(np.argmax(candidate_scores(bbox, xs, ys, params)[0]))
+        S.add(ring[i])
+        bbox = _extend_bbox(bbox, float(xs[i]), float(ys[i]))
 
     return S
 
@@ -181,6 +251,13 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
     perim = perimeter_with_open_dirs(S)
     if not perim: return S
 
+    radius = params.radius
+    xs, ys = hex_pixels(list(S), radius)
+    bbox = (float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max()))
+
+    def err_with(h: Hex) -> float:
+        return aspect_error_with(bbox, *axial_to_pixel(h, radius), params)
+
     tol_log = (0.45 - 0.35 * params.aspect_adherence)
 
     lengths = [int(rng.integers(params.tendril_len_min, params.tendril_len_max + 1))
@@ -192,7 +269,7 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
         current = Hex(start.q + direction[0], start.r + direction[1])
         steps = 0
         while steps < L and len(S) < total_target:
-            e = aspect_error(aspect_ratio_from_hexes(S | {current}, params), params.aspect())
+            e = err_with(current)
             if e > tol_log:
                 back = Hex(current.q - direction[0], current.r - direction[1])
                 alt_dirs = [d for d in DIRECTIONS if Hex(back.q + d[0], back.r + d[1]) not in S]
@@ -200,7 +277,7 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
                 best_dir, best_err = None, float('inf')
                 for d in alt_dirs:
                     cand = Hex(back.q + d[0], back.r + d[1])
-                    ee = aspect_error(aspect_ratio_from_hexes(S | {cand}, params), params.aspect())
+                    ee = err_with(cand)
                     if ee < best_err:
                         best_err, best_dir = ee, d
                 if best_dir is None or best_err > tol_log: break
@@ -209,6 +286,7 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
 
             if current in S: break
             S.add(current); steps += 1
+            bbox = _extend_bbox(bbox, *axial_to_pixel(current, radius))
             if rng.random() < params.tendril_direction_variability:
                 idx = DIRECTIONS.index(direction)
                 turn = int(rng.choice([-1, 1]))
@@ -219,15 +297,13 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
     while len(S) < total_target:
         perim = perimeter_with_open_dirs(S)
         if not perim: break
-        best, best_sc = None, -1.0
-        for (start, dirs) in perim:
-            for d in dirs:
-                cand = Hex(start.q + d[0], start.r + d[1])
-                sc = candidate_score(S, cand, params)
-                if sc > best_sc and cand not in S:
-                    best, best_sc = cand, sc
-        if best is None: break
-        S.add(best)
+        cands = [Hex(start.q + d[0], start.r + d[1])
+                 for (start, dirs) in perim for d in dirs]
+        xs, ys = hex_pixels(cands, radius)
+        # first best, as before
+        i = int(np.argmax(candidate_scores(bbox, xs, ys, params)[0]))
+        S.add(cands[i])
+        bbox = _extend_bbox(bbox, float(xs[i]), float(ys[i]))
     return S
 
 # -------------------------------
@@ -235,11 +311,11 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
 # -------------------------------
 def assign_colors_random(hexes: List[Hex], rng: np.random.Generator,
                          colors: List[str], counts: List[int]) -> List[str]:
-    pal: List[str] = []
-    for c, k in zip(colors, counts):
-        pal.extend([c] * int(k))
-    rng.shuffle(pal)
-    return pal[:len(hexes)]
+    # Shuffle a contiguous index array in C; Generator.shuffle makes the same draws for
+    # an ndarray as for a list, so the permutation (and every layout) is unchanged
+    idx = np.repeat(np.arange(len(colors)), [int(k) for k in counts])
+    rng.shuffle(idx)
+    return [colors[i] for i in idx[:len(hexes)].tolist()]
 
 def principal_axis(xs: np.ndarray, ys: np.ndarray) -> Tuple[float, float]:
     X = np.vstack([xs - xs.mean(), ys - ys.mean()])
@@ -339,6 +415,8 @@ def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: L
 # -------------------------------
 # Rendering helpers
 # -------------------------------
+PNG_COMPRESS_LEVEL = 1  # zlib fast path: ~3x quicker encode for a few % larger files
+
 def plot_layout_on_ax(ax, hexes: List[Hex], colors_assigned: List[str],
                       params: LayoutParams, title: str = "") -> Tuple[float, float]:
     for (h, c) in sorted(zip(hexes, colors_assigned), key=lambda t: (t[0].q, t[0].r)):
@@ -364,21 +442,44 @@ def plot_layout_on_ax(ax, hexes: List[Hex], colors_assigned: List[str],
     ax.set_aspect('equal'); ax.axis('off'); ax.set_title(title)
     return w_in, h_in
 
+# Corner angles of RegularPolygon(numVertices=6, orientation=30deg): its unit hexagon
+# starts at 90deg and is then rotated by the orientation
+_HEX_CORNER_ANGLES = np.pi / 2 + math.radians(30) + 2 * np.pi / 6 * np.arange(6)
+
+def hex_polygons(qr: np.ndarray, radius: float) -> np.ndarray:
+    """(N, 6, 2) corner array for axial coords, matching the RegularPolygon patches."""
+    xs = radius * (1.5 * qr[:, 0])
+    ys = radius * (math.sqrt(3)/2 * qr[:, 0] + math.sqrt(3) * qr[:, 1])
+    corners = np.empty((len(qr), 6, 2))
+    corners[:, :, 0] = xs[:, None] + radius * np.cos(_HEX_CORNER_ANGLES)
+    corners[:, :, 1] = ys[:, None] + radius * np.sin(_HEX_CORNER_ANGLES)
+    return corners
+
 def transparent_png_bytes(hexes: List[Hex], colors_assigned: List[str],
-                          params: LayoutParams, dpi: int = 220) -> bytes:
-    fig, ax = plt.subplots(figsize=(6,5), dpi=dpi)
-    for (h, c) in sorted(zip(hexes, colors_assigned), key=lambda t: (t[0].q, t[0].r)):
-        x, y = axial_to_pixel(h, params.radius)
-        ax.add_patch(RegularPolygon((x, y), numVertices=6, radius=params.radius,
-                                    orientation=math.radians(30),
-                                    edgecolor='none', facecolor=c, linewidth=1.0))
-    min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params)
+                          params: LayoutParams, dpi: int = 220,
+                          bbox: Optional[Tuple[float, float, float, float]] = None
+                          ) -> bytes:
+    # standalone Figure (no pyplot figure manager) so layouts can render on worker
+    # threads
+    fig = Figure(figsize=(6,5), dpi=dpi)
+    ax = fig.subplots()
+    # one PolyCollection (corners computed in NumPy) instead of a patch per hex;
+    # drawn in the same (q, r) order
+    qr = hex_coords(hexes)
+    order = np.lexsort((qr[:, 1], qr[:, 0]))
+    ax.add_collection(PolyCollection(hex_polygons(qr[order], params.radius),
+                                     facecolors=[colors_assigned[i] for i in order],
+                                     edgecolors='none', linewidths=1.0), autolim=False)
+    if bbox is None:
+        bbox = full_tile_bbox(hexes, params)
+    min_x, min_y, max_x, max_y = bbox
     pad = 0.5 * params.radius
     ax.set_xlim(min_x - pad, max_x + pad); ax.set_ylim(min_y - pad, max_y + pad)
     ax.set_aspect('equal'); ax.axis('off')
     buf = io.BytesIO()
-    fig.savefig(buf, format='png', transparent=True, bbox_inches='tight', pad_inches=0)
-    plt.close(fig); buf.seek(0)
+    fig.savefig(buf, format='png', transparent=True, bbox_inches='tight', pad_inches=0,
+                pil_kwargs={"compress_level": PNG_COMPRESS_LEVEL})
+    buf.seek(0)
     return buf.getvalue()
 
 # -------------------------------
@@ -0,0 +1,87 @@
+"""
+Shared in-memory registries for generated patterns and uploaded images
+Routers and services hold references to one record per id instead of parallel dict
+copies
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Bounded LRUs (in production, use proper storage): least recently used entries go first
+MAX_STORED_PATTERNS = int(os.getenv("MAX_STORED_PATTERNS", "256"))
+MAX_STORED_IMAGES = int(os.getenv("MAX_STORED_IMAGES", "256"))
+
+
+@dataclass(slots=True)
+class PatternRecord:
+    """Generated pattern kept for download and overlay calculations"""
+    id: str
+    seed: int
+    width_inches: float
+    height_inches: float
+    aspect_ratio: float
+    aspect_deviation: float
+    hexes: Tuple[Tuple[int, int], ...]
+    colors: List[str]
+    png_bytes: Optional[bytes]  # None until first download when generated without PNG
+    etag: Optional[str]
+    params_key: tuple  # layout parameters, to render the PNG on demand
+
+
+@dataclass(slots=True)
+class ImageRecord:
+    """Processed upload; holds the encoded bytes, the data URL is built on demand"""
+    id: str
+    width: int
+    height: int
+    format: str
+    data: bytes
+    original_width: int
+    original_height: int
+
+
+PATTERNS: "OrderedDict[str, PatternRecord]" = OrderedDict()
+IMAGES: "OrderedDict[str, ImageRecord]" = OrderedDict()
+
+# Stores are written from worker threads (uploads, pattern generation) while the event
+# loop reads them; one lock keeps each multi-step LRU update atomic
+_lock = threading.Lock()
+
+
+def _put(store: OrderedDict, key: str, record, limit: int) -> None:
+    with _lock:
+        store[key] = record
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+
+def _get(store: OrderedDict, key: str):
+    with _lock:
+        record = store.get(key)
+        if record is not None:
+            store.move_to_end(key)
+        return record
+
+
+def store_pattern(record: PatternRecord) -> None:
+    """Insert or refresh a pattern, evicting the oldest beyond MAX_STORED_PATTERNS"""
+    _put(PATTERNS, record.id, record, MAX_STORED_PATTERNS)
+
+
+def get_pattern(pattern_id: str) -> Optional[PatternRecord]:
+    """Pattern by id (refreshing its LRU position), or None once evicted/unknown"""
+    return _get(PATTERNS, pattern_id)
+
+
+def store_image(record: ImageRecord) -> None:
+    """Insert an image, evicting the oldest beyond MAX_STORED_IMAGES"""
+    _put(IMAGES, record.id, record, MAX_STORED_IMAGES)
+
+
+def get_image(image_id: str) -> Optional[ImageRecord]:
+    """Image by id (refreshing its LRU position), or None once evicted/unknown"""
+    return _get(IMAGES, image_id)
@@ -0,0 +1,61 @@
+"""Shared fixtures for all backend tests."""
+
+import functools
+import io
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from PIL import Image
+
+# Ensure backend root is importable for `from src...` imports.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from src.main import app
+
+
+@functools.lru_cache(maxsize=32)
+def _encode_test_image(
+    width: int = 800, height: int = 600, format: str = "PNG"
+) -> bytes:
+    image = Image.new("RGB", (width, height), color="red")
+    buffer = io.BytesIO()
+    # PNG: fast zlib; ignored by other formats
+    image.save(buffer, format=format, compress_level=1)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="session")
+def create_test_image():
+    """Return the in-memory test image factory (width, height, format) -> bytes.
+
+    Encodes are cached per (size, format); the bytes are immutable, and the test client
+    wraps them in a fresh stream for each request.
+    """
+    return _encode_test_image
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    """Return one API test client for the whole session.
+
+    Entering the client keeps a single event-loop portal open, instead of starting
+    one per request as a bare module-level TestClient does.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture
+async def async_client() -> httpx.AsyncClient:
+    """Return an in-process async client for tests that issue concurrent requests."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as test_client:
+        yield test_client
@@ -1,34 +1,7 @@
 """Shared fixtures for backend contract tests."""
 
-import io
-import sys
-from pathlib import Path
-
 import pytest
 from fastapi.testclient import TestClient
-from PIL import Image
-
-# Ensure backend root is importable for `from src...` imports.
-BACKEND_ROOT = Path(__file__).resolve().parents[2]
-if str(BACKEND_ROOT) not in sys.path:
-    sys.path.insert(0, str(BACKEND_ROOT))
-
-from src.main import app
-
-
-def create_test_png_bytes(width: int = 800, height: int = 600) -> bytes:
-    """Create a PNG image payload in memory for upload tests."""
-    image = Image.new("RGB", (width, height), color="red")
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer.getvalue()
-
-
-@pytest.fixture
-def client() -> TestClient:
-    """Return an API test client for contract tests."""
-    return TestClient(app)
 
 
 @pytest.fixture
@@ -55,9 +28,9 @@ def pattern_id(client: TestClient) -> str:
 
 
 @pytest.fixture
-def image_id(client: TestClient) -> str:
+def image_id(client: TestClient, create_test_image) -> str:
     """Upload and return a valid image id via API."""
-    png_bytes = create_test_png_bytes()
+    png_bytes = create_test_image(800, 600, "PNG")
     files = {"file": ("test.png", png_bytes, "image/png")}
 
     response = client.post("/api/images/upload", files=files)
@@ -50,3 +50,20 @@ def test_get_allowed_origin_regex_raises_for_invalid_regex(monkeypatch):
 
     with pytest.raises(ValueError, match="Invalid CORS_ALLOW_ORIGIN_REGEX"):
         _get_allowed_origin_regex()
+
+
+def test_preflight_allows_only_used_methods_and_is_cacheable(client):
+    """Preflight answers with the narrowed method list and a max-age."""
+    response = client.options(
+        "/api/patterns/generate",
+        headers={
+            "Origin": "http://localhost:3000",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert response.headers["access-control-max-age"] == "86400"
+    assert "PUT" not in response.headers["access-control-allow-methods"]
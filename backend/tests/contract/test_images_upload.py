@@ -1,22 +1,7 @@
 """Contract tests for POST /api/images/upload endpoint."""
 
-import io
 
-from PIL import Image
-
-
-def create_test_image(
-    width: int = 800, height: int = 600, format: str = "PNG"
-) -> bytes:
-    """Create a test image in memory."""
-    image = Image.new("RGB", (width, height), color="red")
-    buffer = io.BytesIO()
-    image.save(buffer, format=format)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-
-def test_upload_image_valid_png(client):
+def test_upload_image_valid_png(client, create_test_image):
     """Test successful image upload with valid PNG."""
     image_data = create_test_image(1200, 900, "PNG")
 
@@ -45,7 +30,7 @@ def test_upload_image_valid_png(client):
     assert max(response_data["width"], response_data["height"]) <= 800
 
 
-def test_upload_image_valid_jpeg(client):
+def test_upload_image_valid_jpeg(client, create_test_image):
     """Test successful image upload with valid JPEG."""
     image_data = create_test_image(600, 400, "JPEG")
 
@@ -90,7 +75,7 @@ def test_upload_image_no_file(client):
     assert len(data["detail"]) > 0
 
 
-def test_upload_image_large_file_current_behavior(client):
+def test_upload_image_large_file_current_behavior(client, create_test_image):
     """Current implementation accepts larger images and processes them."""
     large_image_data = create_test_image(2500, 2500, "PNG")
 
@@ -105,7 +90,7 @@ def test_upload_image_large_file_current_behavior(client):
     assert "processed_data" in payload
 
 
-def test_upload_image_invalid_max_dimension(client):
+def test_upload_image_invalid_max_dimension(client, create_test_image):
     """Test 422 validation error for invalid max_dimension parameter."""
     image_data = create_test_image(800, 600, "PNG")
 
@@ -119,3 +104,49 @@ def test_upload_image_invalid_max_dimension(client):
     assert "detail" in payload
     assert isinstance(payload["detail"], list)
     assert len(payload["detail"]) > 0
+
+
+def test_upload_image_store_evicts_oldest(client, monkeypatch, create_test_image):
+    """Test the image store keeps raw bytes and evicts least recently used uploads."""
+    from src.services import registry
+    from src.services.image_service import image_service
+
+    monkeypatch.setattr(registry, "MAX_STORED_IMAGES", 2)
+    ids = []
+    for _ in range(3):
+        files = {"file": ("test.png", create_test_image(64, 48, "PNG"), "image/png")}
+        response = client.post("/api/images/upload", files=files)
+        assert response.status_code == 200
+        ids.append(response.json()["image_id"])
+
+    # Contract: Oldest upload is gone, newest ones are still stored
+    assert ids[0] not in registry.IMAGES
+    assert image_service.get_data_url(ids[2]) == response.json()["processed_data"]
+
+
+def test_upload_image_too_many_pixels(client, monkeypatch, create_test_image):
+    """Test 413 for images above the pixel limit, rejected from the header alone."""
+    from src.services import image_service
+
+    monkeypatch.setattr(image_service, "MAX_UPLOAD_PIXELS", 1000 * 1000)
+    image_data = create_test_image(1200, 900, "PNG")
+
+    files = {"file": ("big.png", image_data, "image/png")}
+    response = client.post("/api/images/upload", files=files)
+
+    assert response.status_code == 413
+    assert "Image too large" in response.json()["detail"]
+
+
+def test_upload_image_body_over_byte_limit(client, monkeypatch, create_test_image):
+    """Test 413 from Content-Length before the multipart body is parsed."""
+    from src.services import image_service
+
+    monkeypatch.setattr(image_service, "MAX_UPLOAD_BYTES", 1024)
+    image_data = create_test_image(800, 600, "BMP")
+
+    files = {"file": ("big.bmp", image_data, "image/bmp")}
+    response = client.post("/api/images/upload", files=files)
+
+    assert response.status_code == 413
+    assert "detail" in response.json()
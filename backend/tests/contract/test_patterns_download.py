@@ -1,5 +1,7 @@
 """Contract tests for GET /api/patterns/{pattern_id}/download endpoint."""
 
+import base64
+
 
 def test_download_pattern_valid_id(client, pattern_id):
     """Test successful pattern download with generated valid pattern ID."""
@@ -15,6 +17,29 @@ def test_download_pattern_valid_id(client, pattern_id):
     assert len(content) > 0
 
 
+def test_download_pattern_etag_revalidation(client, pattern_id):
+    """Test ETag is returned and a matching If-None-Match yields 304."""
+    response = client.get(f"/api/patterns/{pattern_id}/download")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    # Contract: Matching validator returns 304 with no body
+    cached = client.get(
+        f"/api/patterns/{pattern_id}/download", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    # Contract: Stale validator returns the full PNG
+    stale = client.get(
+        f"/api/patterns/{pattern_id}/download", headers={"If-None-Match": '"stale"'}
+    )
+    assert stale.status_code == 200
+    assert stale.content == response.content
+
+
 def test_download_pattern_invalid_id(client):
     """Test 404 error for non-existent pattern ID."""
     pattern_id = "nonexistent_pattern"
@@ -35,3 +60,146 @@ def test_download_pattern_empty_id(client):
 
     # Contract: Should return 404 for invalid route
     assert response.status_code == 404
+
+
+def test_download_pattern_evicted_after_store_limit(client, monkeypatch):
+    """Test least recently used patterns are evicted once the store is full."""
+    from src.services import registry
+
+    monkeypatch.setattr(registry, "MAX_STORED_PATTERNS", 2)
+    request_data = {
+        "aspect_w": 1,
+        "aspect_h": 1,
+        "total_tiles": 6,
+        "colors": ["#273c6b"],
+        "counts": [6],
+        "color_mode": "random",
+        "seed": 4242,
+        "num_layouts": 3,
+    }
+    response = client.post("/api/patterns/generate", json=request_data)
+    assert response.status_code == 200
+    ids = [p["id"] for p in response.json()["patterns"]]
+
+    # Contract: Oldest pattern is gone, newest ones are still downloadable
+    assert client.get(f"/api/patterns/{ids[0]}/download").status_code == 404
+    assert client.get(f"/api/patterns/{ids[1]}/download").status_code == 200
+    assert client.get(f"/api/patterns/{ids[2]}/download").status_code == 200
+
+
+def test_repeated_generate_reuses_stored_patterns(client):
+    """Test identical requests map onto the same content-addressed pattern entries."""
+    from src.services import registry
+
+    request_data = {
+        "aspect_w": 4,
+        "aspect_h": 3,
+        "total_tiles": 12,
+        "colors": ["#273c6b", "#92323d"],
+        "counts": [6, 6],
+        "color_mode": "random",
+        "seed": 5150,
+        "num_layouts": 2,
+    }
+    def generate_ids():
+        response = client.post("/api/patterns/generate", json=request_data)
+        return [p["id"] for p in response.json()["patterns"]]
+
+    first = generate_ids()
+    stored = len(registry.PATTERNS)
+    second = generate_ids()
+
+    # Contract: Same ids, no new store entries
+    assert second == first
+    assert len(registry.PATTERNS) == stored
+
+
+def test_reused_pattern_entry_tracks_latest_target_aspect(client):
+    """Test a reused pattern entry stores the deviation for the latest request."""
+    from src.services import registry
+
+    # A single tile is the same layout (and id) whatever the target aspect
+    request_data = {
+        "aspect_w": 1,
+        "aspect_h": 1,
+        "total_tiles": 1,
+        "colors": ["#273c6b"],
+        "counts": [1],
+        "color_mode": "random",
+        "seed": 777,
+        "num_layouts": 1,
+    }
+    first = client.post("/api/patterns/generate", json=request_data).json()
+    request_data.update(aspect_w=4, include_png=False)
+    second = client.post("/api/patterns/generate", json=request_data).json()
+
+    pattern = second["patterns"][0]
+    assert pattern["id"] == first["patterns"][0]["id"]
+    assert pattern["aspect_deviation"] != first["patterns"][0]["aspect_deviation"]
+
+    # Contract: Stored entry has the new deviation and keeps the PNG already rendered
+    record = registry.get_pattern(pattern["id"])
+    assert record.aspect_deviation == pattern["aspect_deviation"]
+    assert record.png_bytes is not None
+
+
+def test_thumbnail_matches_download_for_metadata_only_generate(client):
+    """Test inline=false omits png_data and the thumbnail serves the stored PNG."""
+    request_data = {
+        "aspect_w": 16,
+        "aspect_h": 9,
+        "aspect_adherence": 0.75,
+        "total_tiles": 12,
+        "colors": ["#273c6b", "#92323d"],
+        "counts": [6, 6],
+        "color_mode": "random",
+        "seed": 321,
+        "num_layouts": 2,
+    }
+
+    response = client.post("/api/patterns/generate?inline=false", json=request_data)
+    assert response.status_code == 200
+    patterns = response.json()["patterns"]
+    assert [pattern["png_data"] for pattern in patterns] == ["", ""]
+
+    for pattern in patterns:
+        thumbnail = client.get(f"/api/patterns/{pattern['id']}/thumbnail")
+        assert thumbnail.status_code == 200
+        assert thumbnail.headers["content-type"] == "image/png"
+        assert thumbnail.headers["content-disposition"].startswith("inline")
+        download = client.get(f"/api/patterns/{pattern['id']}/download")
+        assert thumbnail.content == download.content
+
+    missing = client.get("/api/patterns/nonexistent_pattern/thumbnail")
+    assert missing.status_code == 404
+
+
+def test_download_renders_pattern_generated_without_png(client):
+    """Test include_png=false skips the PNG but download renders it later."""
+    request_data = {
+        "aspect_w": 16,
+        "aspect_h": 9,
+        "aspect_adherence": 0.75,
+        "total_tiles": 12,
+        "colors": ["#273c6b", "#92323d"],
+        "counts": [6, 6],
+        "color_mode": "random",
+        "seed": 654,
+        "num_layouts": 1,
+    }
+
+    metadata_only = client.post(
+        "/api/patterns/generate", json={**request_data, "include_png": False}
+    ).json()["patterns"][0]
+    assert metadata_only["png_data"] == ""
+
+    download = client.get(f"/api/patterns/{metadata_only['id']}/download")
+    assert download.status_code == 200
+    assert download.content.startswith(b"\x89PNG\r\n\x1a\n")
+
+    # Same layout with the PNG maps onto the same id and the same bytes
+    response = client.post("/api/patterns/generate", json=request_data)
+    full = response.json()["patterns"][0]
+    assert full["id"] == metadata_only["id"]
+    assert full["hexes"] == metadata_only["hexes"]
+    assert base64.b64decode(full["png_data"]) == download.content
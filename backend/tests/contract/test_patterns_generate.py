@@ -170,3 +170,70 @@ def test_generate_patterns_out_of_range_values(client):
 
     response = client.post("/api/patterns/generate", json=request_data)
     assert_fastapi_validation_error(response)
+
+
+MSGPACK_REQUEST = {
+    "aspect_w": 4,
+    "aspect_h": 3,
+    "total_tiles": 24,
+    "colors": ["#273c6b", "#92323d"],
+    "counts": [12, 12],
+    "color_mode": "random",
+    "seed": 77,
+    "num_layouts": 2,
+}
+
+
+def test_generate_patterns_msgpack_matches_json(client):
+    """Binary variant carries raw PNG bytes and the same layouts as /generate"""
+    ormsgpack = pytest.importorskip("ormsgpack")
+
+    response = client.post("/api/patterns/generate.msgpack", json=MSGPACK_REQUEST)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    packed = ormsgpack.unpackb(response.content)["patterns"]
+
+    response_json = client.post("/api/patterns/generate", json=MSGPACK_REQUEST).json()
+    expected = response_json["patterns"]
+    assert len(packed) == len(expected)
+    for binary, pattern in zip(packed, expected):
+        assert binary["id"] == pattern["id"]
+        assert binary["png"] == base64.b64decode(pattern["png_data"])
+        assert binary["colors"] == pattern["colors"]
+
+
+def test_generate_patterns_msgpack_unavailable(client, monkeypatch):
+    """Without the optional ormsgpack dependency the binary variant reports 501"""
+    from src.api import patterns
+
+    monkeypatch.setattr(patterns, "ormsgpack", None)
+    response = client.post("/api/patterns/generate.msgpack", json=MSGPACK_REQUEST)
+    assert response.status_code == 501
+
+
+def test_generate_patterns_response_is_gzipped(client):
+    """Large generate responses are gzip-encoded when the client accepts it"""
+    request_data = {
+        "aspect_w": 16,
+        "aspect_h": 9,
+        "aspect_adherence": 0.75,
+        "total_tiles": 12,
+        "colors": ["#273c6b", "#92323d"],
+        "counts": [6, 6],
+        "color_mode": "random",
+        "seed": 123,
+        "num_layouts": 2,
+    }
+
+    response = client.post(
+        "/api/patterns/generate",
+        json=request_data,
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["patterns"]) == 2
+
+    health = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in health.headers
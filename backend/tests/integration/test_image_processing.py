@@ -4,24 +4,11 @@ Tests image resizing, format conversion, and storage
 """
 
 import pytest
-import io
-from PIL import Image
-from fastapi.testclient import TestClient
-from src.main import app
 
-client = TestClient(app)
-
-def create_test_image(width: int, height: int, format: str = "PNG") -> bytes:
-    """Create a test image in memory"""
-    image = Image.new("RGB", (width, height), color=(255, 0, 0))
-    buffer = io.BytesIO()
-    image.save(buffer, format=format)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-def test_image_upload_and_resize_workflow():
+def test_image_upload_and_resize_workflow(client, create_test_image):
     """Test complete image upload and processing workflow"""
-    # Create large test image
+    # Create large test image: an exact 2x multiple of the 800px target, so the
+    # resized dimensions are exact with no rounding
     large_image = create_test_image(1600, 1200, "PNG")
     
     files = {"file": ("large_image.png", large_image, "image/png")}
@@ -46,7 +33,7 @@ def test_image_upload_and_resize_workflow():
     assert result["processed_data"].startswith("data:image/")
     assert result["image_id"] is not None
 
-def test_image_processing_different_formats():
+def test_image_processing_different_formats(client, create_test_image):
     """Test image processing for different input formats"""
     test_cases = [
         {"format": "PNG", "width": 400, "height": 300},
@@ -65,7 +52,7 @@ def test_image_processing_different_formats():
         assert result["height"] == case["height"]
         assert len(result["processed_data"]) > 0
 
-def test_image_overlay_calculation_integration():
+def test_image_overlay_calculation_integration(client, create_test_image):
     """Test integration between image upload and overlay calculation"""
     # Step 1: Upload an image
     image_data = create_test_image(800, 600, "PNG")
@@ -120,4 +107,20 @@ def test_image_overlay_calculation_integration():
     assert physical["width_inches"] > 0
     assert physical["height_inches"] > 0
     assert visual["width_px"] > 0
-    assert visual["height_px"] > 0
\ No newline at end of file
+    assert visual["height_px"] > 0
+
+
+def test_image_processing_keeps_jpeg_output_after_resize(client, create_test_image):
+    """Test resized JPEG uploads are re-encoded as JPEG, PNG uploads as PNG"""
+    for fmt, mime in (("JPEG", "image/jpeg"), ("PNG", "image/png")):
+        image_data = create_test_image(1600, 1200, fmt)
+        files = {"file": (f"large.{fmt.lower()}", image_data, mime)}
+
+        response = client.post(
+            "/api/images/upload", files=files, data={"max_dimension": 800}
+        )
+        assert response.status_code == 200
+
+        result = response.json()
+        assert result["format"] == fmt
+        assert result["processed_data"].startswith(f"data:{mime};base64,")
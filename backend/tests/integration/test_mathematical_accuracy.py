@@ -3,13 +3,11 @@ Integration tests for mathematical accuracy vs original Streamlit
 Tests that the new API produces identical results to the original system
 """
 
-import pytest
-from fastapi.testclient import TestClient
-from src.main import app
+from collections import Counter
 
-client = TestClient(app)
+import pytest
 
-def test_mathematical_accuracy_exact_reproduction():
+def test_mathematical_accuracy_exact_reproduction(client):
     """Test that API produces identical results to original Streamlit for same seeds"""
     # These expected values would come from running the original Streamlit version
     # with the same parameters and recording the output
@@ -27,7 +25,8 @@ def test_mathematical_accuracy_exact_reproduction():
                 "tendrils": 3,
                 "tendril_len_min": 2,
                 "tendril_len_max": 4,
-                "num_layouts": 1
+                "num_layouts": 1,
+                "include_png": False  # only hexes/dimensions are checked
             },
             # Expected values from original Streamlit (would be populated during implementation)
             "expected_hex_count": 36,
@@ -55,8 +54,9 @@ def test_mathematical_accuracy_exact_reproduction():
             assert isinstance(hex_coord["q"], int)
             assert isinstance(hex_coord["r"], int)
 
-def test_random_number_generator_consistency():
+def test_random_number_generator_consistency(client):
     """Test that the random number generator produces consistent results"""
+    from src.api import patterns
     fixed_seed = 42
     
     params = {
@@ -70,9 +70,10 @@ def test_random_number_generator_consistency():
         "num_layouts": 2
     }
     
-    # Run generation multiple times
+    # Run generation multiple times, recomputing each run (not a layout cache hit)
     responses = []
     for _ in range(3):
+        patterns._generate_one.cache_clear()
         response = client.post("/api/patterns/generate", json=params)
         assert response.status_code == 200
         responses.append(response.json())
@@ -97,7 +98,7 @@ def test_random_number_generator_consistency():
             assert pattern["width_inches"] == first_pattern["width_inches"]
             assert pattern["height_inches"] == first_pattern["height_inches"]
 
-def test_color_distribution_accuracy():
+def test_color_distribution_accuracy(client):
     """Test that color distribution exactly matches requested counts"""
     test_cases = [
         {
@@ -121,7 +122,8 @@ def test_color_distribution_accuracy():
             "counts": case["counts"],
             "color_mode": "random",
             "seed": 999,
-            "num_layouts": 1
+            "num_layouts": 1,
+            "include_png": False  # only colors are checked
         }
         
         response = client.post("/api/patterns/generate", json=params)
@@ -131,9 +133,7 @@ def test_color_distribution_accuracy():
         assigned_colors = pattern["colors"]
         
         # Count each color in the result
-        color_counts = {}
-        for color in assigned_colors:
-            color_counts[color] = color_counts.get(color, 0) + 1
+        color_counts = Counter(assigned_colors)
         
         # Verify exact match to requested counts
         for i, color in enumerate(case["colors"]):
@@ -141,7 +141,7 @@ def test_color_distribution_accuracy():
             actual_count = color_counts.get(color, 0)
             assert actual_count == expected_count, f"Color {color}: expected {expected_count}, got {actual_count}"
 
-def test_aspect_ratio_mathematical_precision():
+def test_aspect_ratio_mathematical_precision(client):
     """Test aspect ratio calculations for mathematical precision"""
     test_cases = [
         {"aspect_w": 1, "aspect_h": 1, "expected_ratio": 1.0},
@@ -189,7 +189,7 @@ def test_aspect_ratio_mathematical_precision():
         assert len(good_patterns) >= len(patterns) // 2, f"Only {len(good_patterns)}/{len(patterns)} patterns had <20% deviation for {case['aspect_w']}:{case['aspect_h']}"
         assert median_deviation < 0.25, f"Median deviation too high: {median_deviation:.3f} for target {target_ratio:.3f}"
 
-def test_png_generation_consistency():
+def test_png_generation_consistency(client):
     """Test that PNG generation is consistent and produces valid images"""
     params = {
         "aspect_w": 2,
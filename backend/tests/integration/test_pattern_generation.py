@@ -3,13 +3,11 @@ Integration tests for pattern generation workflow
 Tests end-to-end pattern generation and mathematical accuracy
 """
 
-import pytest
-from fastapi.testclient import TestClient
-from src.main import app
+import asyncio
 
-client = TestClient(app)
+import pytest
 
-def test_pattern_generation_workflow_complete():
+def test_pattern_generation_workflow_complete(client):
     """Test complete pattern generation workflow from request to download"""
     # Step 1: Generate patterns
     request_data = {
@@ -49,7 +47,7 @@ def test_pattern_generation_workflow_complete():
         assert download_response.headers["content-type"] == "image/png"
         assert len(download_response.content) > 0
 
-def test_pattern_generation_different_color_strategies():
+def test_pattern_generation_different_color_strategies(client):
     """Test pattern generation with different color assignment strategies"""
     base_request = {
         "aspect_w": 4,
@@ -88,7 +86,7 @@ def test_pattern_generation_different_color_strategies():
         expected_colors = set(["#FF0000", "#00FF00", "#0000FF"])
         assert used_colors == expected_colors
 
-def test_pattern_generation_aspect_ratio_adherence():
+def test_pattern_generation_aspect_ratio_adherence(client):
     """Test that generated patterns respect aspect ratio constraints"""
     test_cases = [
         {"aspect_w": 1, "aspect_h": 1, "adherence": 0.9, "tolerance": 0.25},  # Square, strict
@@ -133,8 +131,9 @@ def test_pattern_generation_aspect_ratio_adherence():
         median_dev = statistics.median(deviations)
         assert median_dev <= case["tolerance"] * 1.2, f"Median deviation {median_dev:.3f} too high for tolerance {case['tolerance']}"
 
-def test_pattern_generation_reproducibility():
+def test_pattern_generation_reproducibility(client):
     """Test that identical parameters produce identical results"""
+    from src.api import patterns
     request_data = {
         "aspect_w": 3,
         "aspect_h": 2,
@@ -147,8 +146,10 @@ def test_pattern_generation_reproducibility():
         "num_layouts": 1
     }
     
-    # Generate same pattern twice
+    # Generate same pattern twice, recomputing it each time (not a layout cache hit)
+    patterns._generate_one.cache_clear()
     response1 = client.post("/api/patterns/generate", json=request_data)
+    patterns._generate_one.cache_clear()
     response2 = client.post("/api/patterns/generate", json=request_data)
     
     assert response1.status_code == 200
@@ -164,7 +165,87 @@ def test_pattern_generation_reproducibility():
     assert pattern1["width_inches"] == pattern2["width_inches"]
     assert pattern1["height_inches"] == pattern2["height_inches"]
 
-def test_pattern_generation_tile_count_validation():
+
+@pytest.mark.asyncio
+async def test_pattern_generation_concurrent_requests(async_client):
+    """Test that concurrent generate requests are served together and agree"""
+    request_data = {
+        "aspect_w": 3,
+        "aspect_h": 2,
+        "total_tiles": 18,
+        "colors": ["#AA0000", "#00AA00"],
+        "counts": [9, 9],
+        "color_mode": "random",
+        "seed": 2024,
+        "num_layouts": 2
+    }
+
+    # Whether each request computes or hits the layout cache depends on timing;
+    # either way every response must succeed with the same patterns
+    responses = await asyncio.gather(*(
+        async_client.post("/api/patterns/generate", json=request_data)
+        for _ in range(3)
+    ))
+
+    assert all(response.status_code == 200 for response in responses)
+    first = responses[0].json()["patterns"]
+    for response in responses[1:]:
+        assert response.json()["patterns"] == first
+
+
+def test_pattern_generation_reported_seed_reproduces_layout(client):
+    """Test that a layout's reported seed regenerates it as a single-layout request"""
+    request_data = {
+        "aspect_w": 3,
+        "aspect_h": 2,
+        "total_tiles": 18,
+        "colors": ["#AA0000", "#00AA00"],
+        "counts": [9, 9],
+        "color_mode": "random",
+        "seed": 999,
+        "radius": 1.0,
+        "num_layouts": 3
+    }
+    batch = client.post("/api/patterns/generate", json=request_data).json()["patterns"]
+    
+    single = client.post(
+        "/api/patterns/generate",
+        json={**request_data, "seed": batch[2]["seed"], "num_layouts": 1},
+    ).json()["patterns"][0]
+    
+    assert single["hexes"] == batch[2]["hexes"]
+    assert single["colors"] == batch[2]["colors"]
+
+def test_pattern_generation_worker_processes_match_in_process(client, monkeypatch):
+    """Test layouts rendered in worker processes equal the in-process ones"""
+    from src.api import patterns
+
+    request_data = {
+        "aspect_w": 4,
+        "aspect_h": 3,
+        "total_tiles": 24,
+        "colors": ["#273c6b", "#92323d"],
+        "counts": [12, 12],
+        "color_mode": "random",
+        "seed": 4242,
+        "num_layouts": 2
+    }
+    patterns._generate_one.cache_clear()
+    response = client.post("/api/patterns/generate", json=request_data)
+    in_process = response.json()["patterns"]
+
+    monkeypatch.setattr(patterns, "PATTERN_PROCESSES", 2)
+    patterns._generate_one.cache_clear()
+    try:
+        response = client.post("/api/patterns/generate", json=request_data)
+        pooled = response.json()["patterns"]
+    finally:
+        patterns.shutdown_layout_pool()
+        patterns._generate_one.cache_clear()
+
+    assert pooled == in_process
+
+def test_pattern_generation_tile_count_validation(client):
     """Test validation of tile counts and color constraints"""
     # Test valid tile count distribution
     valid_request = {
@@ -29,12 +29,18 @@ from __future__ import annotations
 import argparse
 import csv
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Sequence, Set, Tuple, Dict
+from typing import TYPE_CHECKING, List, Optional, Sequence, Set, Tuple, Dict
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import RegularPolygon
+
+# matplotlib is imported where figures are built, so generation (and pool workers)
+# never pay its import cost
+if TYPE_CHECKING:
+    import matplotlib.axes
+    import matplotlib.pyplot as plt
 
 # -------------------------------
 # Hex grid math (pointy-topped)
@@ -60,6 +66,45 @@ def axial_to_pixel(h: Hex, R: float) -> Tuple[float, float]:
     y = R * (math.sqrt(3)/2 * h.q + math.sqrt(3) * h.r)
     return x, y
 
+# Batch form: (N, 2) pixel centres in one NumPy pass, same arithmetic as axial_to_pixel
+
+def qr_to_pixel(qr: np.ndarray, R: float) -> np.ndarray:
+    qr = np.asarray(qr, dtype=float).reshape(-1, 2)
+    xy = np.empty_like(qr)
+    xy[:, 0] = R * (1.5 * qr[:, 0])
+    xy[:, 1] = R * (math.sqrt(3)/2 * qr[:, 0] + math.sqrt(3) * qr[:, 1])
+    return xy
+
+def axial_to_pixel_batch(hexes: Sequence[Hex], R: float) -> np.ndarray:
+    # (q, r) streamed straight into a float buffer: no per-hex tuples for NumPy to re-copy
+    qr = np.fromiter((v for h in hexes for v in (h.q, h.r)), dtype=float, count=2 * len(hexes))
+    return qr_to_pixel(qr, R)
+
+# Packed axial keys used while growing a layout: encode(q, r) is one small int,
+# so set membership hashes an int and a neighbour is one add of DELTAS_ENC[i]
+# (the delta for DIRECTIONS[i]). Valid while |q|, |r| < 2**19.
+_KEY_OFF = 1 << 19
+_KEY_MASK = (1 << 20) - 1
+
+def encode(q: int, r: int) -> int:
+    return ((q + _KEY_OFF) << 20) | (r + _KEY_OFF)
+
+def decode(key: int) -> Hex:
+    return Hex((key >> 20) - _KEY_OFF, (key & _KEY_MASK) - _KEY_OFF)
+
+DELTAS_ENC: List[int] = [encode(dq, dr) - encode(0, 0) for dq, dr in DIRECTIONS]
+
+def keys_to_pixel(keys: Sequence[int], R: float) -> np.ndarray:
+    # (N, 2) pixel centres straight from packed keys: qr_to_pixel's arithmetic on the
+    # decoded integer columns, with no intermediate (q, r) array
+    k = np.array(keys, dtype=np.int64)
+    q = (k >> 20) - _KEY_OFF
+    r = (k & _KEY_MASK) - _KEY_OFF
+    xy = np.empty((k.size, 2))
+    np.multiply(R, 1.5 * q, out=xy[:, 0])
+    np.multiply(R, math.sqrt(3)/2 * q + math.sqrt(3) * r, out=xy[:, 1])
+    return xy
+
 # -------------------------------
 # Layout generation
 # -------------------------------
@@ -89,24 +134,38 @@ class LayoutParams:
     def aspect(self) -> float:
         return max(1e-6, self.aspect_w / self.aspect_h)
 
+    def log_aspect(self) -> float:
+        return math.log(self.aspect())
+
 # Utility: compute pixel-space bounding box of a set of hex centers
 
 def bounds_px(hexes: Set[Hex], R: float) -> Tuple[float, float, float, float]:
     xs, ys = zip(*(axial_to_pixel(h, R) for h in hexes)) if hexes else ([0], [0])
     return min(xs), min(ys), max(xs), max(ys)
 
-# Heuristic score balancing aspect and compactness
+# Running bounds: the bounds of S | {(x, y)} from the bounds of S in four comparisons
 
-def candidate_score(hexes: Set[Hex], candidate: Hex, params: LayoutParams) -> float:
-    new_set = set(hexes)
-    new_set.add(candidate)
-    x0, y0, x1, y1 = bounds_px(new_set, params.radius)
-    width = max(1e-6, x1 - x0 + params.radius)
-    height = max(1e-6, y1 - y0 + params.radius)
+def extend_bounds(bounds: Tuple[float, float, float, float], x: float, y: float) -> Tuple[float, float, float, float]:
+    x0, y0, x1, y1 = bounds
+    return min(x0, x), min(y0, y), max(x1, x), max(y1, y)
 
-    target = params.aspect()
+# Heuristic score balancing aspect and compactness, for adding a tile centred at
+# (xs[i], ys[i]) to a set whose centre bounds are `bounds` (kept up to date with
+# extend_bounds), for every candidate at once; the candidate-augmented bounds are
+# one broadcast min/max instead of a copied and rescanned set per candidate
+
+def candidate_scores(bounds: Tuple[float, float, float, float], xs: np.ndarray, ys: np.ndarray,
+                     params: LayoutParams, log_target: Optional[float] = None) -> np.ndarray:
+    if log_target is None:
+        log_target = params.log_aspect()
+    x0, y0, x1, y1 = bounds
+    width = np.maximum(1e-6, np.maximum(x1, xs) - np.minimum(x0, xs) + params.radius)
+    height = np.maximum(1e-6, np.maximum(y1, ys) - np.minimum(y0, ys) + params.radius)
+
+    # log(ratio / target) as log(ratio) - log(target): one division less per
+    # candidate, with log(target) computed once per layout
     ratio = width / height
-    aspect_term = 1.0 / (1.0 + abs(math.log(ratio / target)))
+    aspect_term = 1.0 / (1.0 + np.abs(np.log(ratio) - log_target))
 
     area = width * height
     compact_term = 1.0 / (1.0 + area / (params.radius * params.radius * params.total_tiles * 5.0))
@@ -114,61 +173,87 @@ def candidate_score(hexes: Set[Hex], candidate: Hex, params: LayoutParams) -> fl
     return params.aspect_bias * aspect_term + params.compactness_bias * compact_term
 
 # Grow a connected organic blob of size n using frontier-based selection
+# (S and the frontier hold packed keys)
 
-def grow_blob(n: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex]:
-    S: Set[Hex] = {Hex(0, 0)}
-    frontier: Set[Hex] = set(S.pop().neighbors())
-    S.add(Hex(0, 0))
+def grow_blob(n: int, rng: np.random.Generator, params: LayoutParams) -> Set[int]:
+    origin = encode(0, 0)
+    S: Set[int] = {origin}
+    frontier: Set[int] = {origin + d for d in DELTAS_ENC}
+    bounds = (0.0, 0.0, 0.0, 0.0)  # running centre bounds of S
+    log_target = params.log_aspect()
 
     while len(S) < n and frontier:
         candidates = list(frontier)
-        scores = np.array([candidate_score(S, c, params) for c in candidates], dtype=float)
-        if np.all(scores == 0):
+        xy = keys_to_pixel(candidates, params.radius)
+        scores = candidate_scores(bounds, xy[:, 0], xy[:, 1], params, log_target)
+        if not scores.any():
             probs = np.ones_like(scores) / len(scores)
         else:
-            scores = scores - scores.max()
-            probs = np.exp(scores)
+            # softmax in place: scores is a fresh array owned by this step
+            probs = scores
+            probs -= probs.max()
+            np.exp(probs, out=probs)
             probs /= probs.sum()
-        choice_idx = int(rng.choice(len(candidates), p=probs))
+        # Inverse-CDF draw, exactly what rng.choice(len(candidates), p=probs) does
+        # (same single uniform) without its per-call argument validation
+        cdf = np.cumsum(probs, out=probs)
+        cdf /= cdf[-1]
+        choice_idx = int(cdf.searchsorted(rng.random(), side='right'))
         chosen = candidates[choice_idx]
+        bounds = extend_bounds(bounds, float(xy[choice_idx, 0]), float(xy[choice_idx, 1]))
         S.add(chosen)
         frontier.remove(chosen)
-        for nb in chosen.neighbors():
-            if nb not in S:
-                frontier.add(nb)
+        for d in DELTAS_ENC:
+            if chosen + d not in S:
+                frontier.add(chosen + d)
 
     while len(S) < n:
-        ring: List[Hex] = []
-        for h in list(S):
-            for nb in h.neighbors():
-                if nb not in S and nb not in ring:
+        ring: List[int] = []
+        ring_set: Set[int] = set()  # membership for ring; the list keeps discovery order
+        for h in S:
+            for d in DELTAS_ENC:
+                nb = h + d
+                if nb not in S and nb not in ring_set:
+                    ring_set.add(nb)
                     ring.append(nb)
         if not ring:
             break
         S.add(ring[int(rng.integers(0, len(ring)))])
     return S
 
-# Perimeter open directions
+# Perimeter open directions (indices into DIRECTIONS / DELTAS_ENC; the opposite
+# of side i is (i + 3) % 6) of a set of packed keys
 
-def perimeter_with_open_dirs(S: Set[Hex]) -> List[Tuple[Hex, List[Tuple[int, int]]]]:
-    out: List[Tuple[Hex, List[Tuple[int, int]]]] = []
+def perimeter_with_open_dirs(S: Set[int]) -> List[Tuple[int, List[int]]]:
+    out: List[Tuple[int, List[int]]] = []
     for h in S:
-        open_dirs = []
-        for d in DIRECTIONS:
-            nb = Hex(h.q + d[0], h.r + d[1])
-            if nb not in S:
-                open_dirs.append(d)
+        open_dirs = [i for i, d in enumerate(DELTAS_ENC) if h + d not in S]
         if open_dirs:
             out.append((h, open_dirs))
     return out
 
+# Keep a {key: open directions} perimeter map current after S.add(h): only h and
+# its six neighbours can change, so there is no rescan of S per addition
+
+def update_perimeter(open_map: Dict[int, List[int]], S: Set[int], h: int) -> None:
+    open_dirs = [i for i, d in enumerate(DELTAS_ENC) if h + d not in S]
+    if open_dirs:
+        open_map[h] = open_dirs
+    for i, d in enumerate(DELTAS_ENC):
+        nb_dirs = open_map.get(h + d)
+        if nb_dirs is not None:
+            nb_dirs.remove((i + 3) % 6)  # the neighbour's side facing h is now closed
+            if not nb_dirs:
+                del open_map[h + d]
+
 # Tendril growth
 
-def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, params: LayoutParams) -> Set[Hex]:
+def add_tendrils(S: Set[int], total_target: int, rng: np.random.Generator, params: LayoutParams) -> Set[int]:
     if len(S) >= total_target or params.tendrils <= 0:
         return S
 
-    perim = perimeter_with_open_dirs(S)
+    open_map = dict(perimeter_with_open_dirs(S))
+    perim = list(open_map.items())
     if not perim:
         return S
 
@@ -179,36 +264,37 @@ def add_tendrils(S: Set[Hex], total_target: int, rng: np.random.Generator, param
         if len(S) >= total_target:
             break
         start, dirs = perim[int(rng.integers(0, len(perim)))]
-        direction = dirs[int(rng.integers(0, len(dirs)))]
-        current = Hex(start.q + direction[0], start.r + direction[1])
+        dir_idx = dirs[int(rng.integers(0, len(dirs)))]
+        current = start + DELTAS_ENC[dir_idx]
         steps = 0
         while steps < L and len(S) < total_target:
             if current in S:
                 break
             S.add(current)
+            update_perimeter(open_map, S, current)
             steps += 1
             if rng.random() < params.tendril_direction_variability:
-                idx = DIRECTIONS.index(direction)
-                turn = int(rng.choice([-1, 1]))
-                direction = DIRECTIONS[(idx + turn) % 6]
-            current = Hex(current.q + direction[0], current.r + direction[1])
+                turn = (-1, 1)[int(rng.integers(0, 2))]  # same draw as rng.choice([-1, 1])
+                dir_idx = (dir_idx + turn) % 6
+            current = current + DELTAS_ENC[dir_idx]
             if current in S:
-                back = Hex(current.q - direction[0], current.r - direction[1])
-                alt_dirs = [d for d in DIRECTIONS if Hex(back.q + d[0], back.r + d[1]) not in S]
+                back = current - DELTAS_ENC[dir_idx]
+                alt_dirs = [i for i, d in enumerate(DELTAS_ENC) if back + d not in S]
                 if alt_dirs:
-                    direction = alt_dirs[int(rng.integers(0, len(alt_dirs)))]
-                    current = Hex(back.q + direction[0], back.r + direction[1])
-        perim = perimeter_with_open_dirs(S)
+                    dir_idx = alt_dirs[int(rng.integers(0, len(alt_dirs)))]
+                    current = back + DELTAS_ENC[dir_idx]
+        perim = list(open_map.items())
         if not perim:
             break
 
     while len(S) < total_target:
-        perim = perimeter_with_open_dirs(S)
+        perim = list(open_map.items())
         if not perim:
             break
         start, dirs = perim[int(rng.integers(0, len(perim)))]
-        d = dirs[int(rng.integers(0, len(dirs)))]
-        S.add(Hex(start.q + d[0], start.r + d[1]))
+        nb = start + DELTAS_ENC[dirs[int(rng.integers(0, len(dirs)))]]
+        S.add(nb)
+        update_perimeter(open_map, S, nb)
     return S
 
 # -------------------------------
@@ -232,20 +318,21 @@ def assign_colors_random(n: int, rng: np.random.Generator, params: LayoutParams)
 
 
 def _principal_axis(xs: np.ndarray, ys: np.ndarray) -> Tuple[float, float]:
-    X = np.vstack([xs - xs.mean(), ys - ys.mean()])
-    C = X @ X.T / max(1, X.shape[1] - 1)
-    eigvals, eigvecs = np.linalg.eig(C)
-    idx = int(np.argmax(eigvals))
-    v = eigvecs[:, idx]
-    vx, vy = float(v[0]), float(v[1])
-    norm = math.hypot(vx, vy) or 1.0
-    return vx / norm, vy / norm
-
-
-def assign_colors_gradient(hexes: List[Hex], rng: np.random.Generator, params: LayoutParams) -> List[str]:
-    xs, ys = zip(*(axial_to_pixel(h, params.radius) for h in hexes))
-    xs = np.array(xs, dtype=float)
-    ys = np.array(ys, dtype=float)
+    # Leading eigenvector of the 2x2 covariance [[a, b], [b, d]] in closed form
+    # (no general eig solver); theta in [-pi/2, pi/2] keeps vx >= 0, so the
+    # gradient runs low->high from left to right
+    x = xs - xs.mean()
+    y = ys - ys.mean()
+    a, b, d = float(x @ x), float(x @ y), float(y @ y)
+    theta = 0.5 * math.atan2(2.0 * b, a - d)
+    return math.cos(theta), math.sin(theta)
+
+
+def assign_colors_gradient(hexes: List[Hex], rng: np.random.Generator, params: LayoutParams,
+                           xy: Optional[np.ndarray] = None) -> List[str]:
+    if xy is None:
+        xy = axial_to_pixel_batch(hexes, params.radius)
+    xs, ys = xy[:, 0], xy[:, 1]
 
     axis = params.gradient_axis.lower()
     if axis in ("auto", "principal"):
@@ -264,40 +351,21 @@ def assign_colors_gradient(hexes: List[Hex], rng: np.random.Generator, params: L
     for c in order:
         _validate_color_name(c)
 
+    # Three near-equal bands along the axis (12/12/12 for 36 tiles). array_split
+    # sizes differ by at most one, so no band can be over quota while another is
+    # short and there is nothing to rebalance
     idxs = np.argsort(s)
-    bands = np.array_split(idxs, 3)
-    color_for_idx: Dict[int, str] = {}
-    for band, color in zip(bands, order):
-        for i in band:
-            color_for_idx[int(i)] = color
-
-    counts: Dict[str, int] = {c: 0 for c in ALL_COLORS}
-    for i in range(len(hexes)):
-        counts[color_for_idx[i]] += 1
-    target = {c: 12 for c in ALL_COLORS}
-    if counts != target:
-        sorted_idxs = list(map(int, idxs))
-        for c in ALL_COLORS:
-            while counts[c] > target[c]:
-                src_i = next(i for i in reversed(sorted_idxs) if color_for_idx[i] == c)
-                deficit_colors = [d for d in ALL_COLORS if counts[d] < target[d]]
-                if not deficit_colors:
-                    break
-                d = deficit_colors[0]
-                color_for_idx[src_i] = d
-                counts[c] -= 1
-                counts[d] += 1
-                if counts == target:
-                    break
-
-    colors = [color_for_idx[i] for i in range(len(hexes))]
-    return colors
+    colors = np.empty(len(hexes), dtype=object)
+    for band, color in zip(np.array_split(idxs, 3), order):
+        colors[band] = color
+    return colors.tolist()
 
 
-def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: LayoutParams) -> List[str]:
-    xs, ys = zip(*(axial_to_pixel(h, params.radius) for h in hexes))
-    xs = np.array(xs, dtype=float)
-    ys = np.array(ys, dtype=float)
+def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: LayoutParams,
+                           xy: Optional[np.ndarray] = None) -> List[str]:
+    if xy is None:
+        xy = axial_to_pixel_batch(hexes, params.radius)
+    xs, ys = xy[:, 0], xy[:, 1]
     cx, cy = float(xs.mean()), float(ys.mean())
     d = np.hypot(xs - cx, ys - cy)
 
@@ -309,41 +377,41 @@ def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: L
     z2 = int(round(0.30 * len(hexes)))
     z3 = max(0, len(hexes) - z1 - z2)
 
-    sorted_idxs = list(map(int, np.argsort(d)))
+    sorted_idxs = np.argsort(d)
     zones = [sorted_idxs[:z1], sorted_idxs[z1:z1+z2], sorted_idxs[z1+z2:]]
 
     remaining = {c: 12 for c in ALL_COLORS}
-    color_for_idx: Dict[int, str] = {}
-
-    def fill_zone(indices: List[int], preferred: str, secondary: List[str]):
+    colors_arr = np.full(len(hexes), None, dtype=object)
+    assigned = np.zeros(len(hexes), dtype=bool)
+
+    def fill_slices(indices: np.ndarray, palette: List[str]) -> None:
+        # Colours in palette order, each for as many of the next indices as it has left:
+        # the preferred colour first, then the fallbacks once it runs out
+        pos = 0
+        for c in palette:
+            take = min(len(indices) - pos, remaining[c])
+            if take:
+                colors_arr[indices[pos:pos + take]] = c
+                assigned[indices[pos:pos + take]] = True
+                remaining[c] -= take
+                pos += take
+
+    def fill_zone(indices: np.ndarray, preferred: str, secondary: List[str]):
         rng.shuffle(indices)
-        for i in indices:
-            if remaining[preferred] > 0:
-                color_for_idx[i] = preferred
-                remaining[preferred] -= 1
-            else:
-                for alt in secondary:
-                    if remaining[alt] > 0:
-                        color_for_idx[i] = alt
-                        remaining[alt] -= 1
-                        break
+        fill_slices(indices, [preferred, *secondary])
 
     fill_zone(zones[0], preferred=order[0], secondary=[order[1], order[2]])
     fill_zone(zones[1], preferred=order[1], secondary=[order[0], order[2]])
     fill_zone(zones[2], preferred=order[2], secondary=[order[1], order[0]])
 
-    for i in range(len(hexes)):
-        if i not in color_for_idx:
-            avail = [c for c, k in remaining.items() if k > 0]
-            if avail:
-                c = avail[0]
-                color_for_idx[i] = c
-                remaining[c] -= 1
-
-    colors = [color_for_idx[i] for i in range(len(hexes))]
-    assert sum(1 for c in colors if c == order[0]) <= 12
-    assert sum(1 for c in colors if c == order[1]) <= 12
-    assert sum(1 for c in colors if c == order[2]) <= 12
+    # Holes (only when a zone outgrew every colour's allowance), in index order
+    if not assigned.all():
+        fill_slices(np.flatnonzero(~assigned), list(remaining))
+
+    colors = colors_arr.tolist()
+    assert colors.count(order[0]) <= 12
+    assert colors.count(order[1]) <= 12
+    assert colors.count(order[2]) <= 12
     assert len(colors) == 36
     return colors
 
@@ -351,30 +419,47 @@ def assign_colors_scheme60(hexes: List[Hex], rng: np.random.Generator, params: L
 # Tight bounding box around tiles (pointy-top hex)
 # -------------------------------
 
-def full_tile_bbox(hexes: List[Hex], params: LayoutParams) -> Tuple[float, float, float, float]:
-    xs, ys = zip(*(axial_to_pixel(h, params.radius) for h in hexes))
+def full_tile_bbox(hexes: List[Hex], params: LayoutParams,
+                   xy: Optional[np.ndarray] = None) -> Tuple[float, float, float, float]:
+    if xy is None:
+        xy = axial_to_pixel_batch(hexes, params.radius)
+    (x_lo, y_lo), (x_hi, y_hi) = xy.min(axis=0).tolist(), xy.max(axis=0).tolist()
     dx = (math.sqrt(3) / 2.0) * params.radius
     dy = 1.0 * params.radius
-    min_x = min(xs) - dx
-    max_x = max(xs) + dx
-    min_y = min(ys) - dy
-    max_y = max(ys) + dy
+    min_x = x_lo - dx
+    max_x = x_hi + dx
+    min_y = y_lo - dy
+    max_y = y_hi + dy
     return min_x, min_y, max_x, max_y
 
 # -------------------------------
 # Plotting helpers
 # -------------------------------
 
-def plot_layout_on_ax(ax: plt.Axes, hexes: List[Hex], colors: List[str], params: LayoutParams, title: str = "") -> None:
-    # Draw tiles
-    for (h, c) in sorted(zip(hexes, colors), key=lambda t: (t[0].q, t[0].r)):
-        x, y = axial_to_pixel(h, params.radius)
-        patch = RegularPolygon((x, y), numVertices=6, radius=params.radius, orientation=math.radians(30),
-                               edgecolor='black', facecolor=c, linewidth=1.0)
-        ax.add_patch(patch)
+# Corner angles of RegularPolygon(numVertices=6, orientation=30deg): its unit hexagon
+# starts at 90deg and is then rotated by the orientation
+_HEX_CORNER_ANGLES = np.pi / 2 + math.radians(30) + 2 * np.pi / 6 * np.arange(6)
+_HEX_CORNER_OFFSETS = np.stack([np.cos(_HEX_CORNER_ANGLES), np.sin(_HEX_CORNER_ANGLES)], axis=-1)  # (6, 2)
+
+def hex_polygons(xy: np.ndarray, R: float) -> np.ndarray:
+    # (N, 6, 2) tile corners: the shared unit hexagon scaled by R and translated to each centre
+    return xy[:, None, :] + R * _HEX_CORNER_OFFSETS
+
+def plot_layout_on_ax(ax: "matplotlib.axes.Axes", hexes: List[Hex], colors: List[str], params: LayoutParams, title: str = "",
+                      xy: Optional[np.ndarray] = None) -> None:
+    from matplotlib.collections import PolyCollection
+    from matplotlib.patches import Rectangle
+
+    if xy is None:
+        xy = axial_to_pixel_batch(hexes, params.radius)
+
+    # Draw tiles: one PolyCollection instead of a patch (and transform) per tile, in the
+    # given order (generate_layout returns tiles sorted by (q, r) for stable edge overlap)
+    ax.add_collection(PolyCollection(hex_polygons(xy, params.radius), facecolors=colors,
+                                     edgecolors='black', linewidths=1.0, joinstyle='miter'), autolim=False)
 
     # Tight bounding box (in plot units)
-    min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params)
+    min_x, min_y, max_x, max_y = full_tile_bbox(hexes, params, xy)
 
     # Convert to inches (R_real = 6 in)
     real_R_in = 6.0
@@ -383,8 +468,8 @@ def plot_layout_on_ax(ax: plt.Axes, hexes: List[Hex], colors: List[str], params:
     height_in = (max_y - min_y) * scale
 
     # Draw bounding box and annotate
-    rect = plt.Rectangle((min_x, min_y), max_x - min_x, max_y - min_y,
-                         fill=False, edgecolor='green', linewidth=2, linestyle='--')
+    rect = Rectangle((min_x, min_y), max_x - min_x, max_y - min_y,
+                     fill=False, edgecolor='green', linewidth=2, linestyle='--')
     ax.add_patch(rect)
 
     label_y = max_y + 0.35 * params.radius
@@ -403,21 +488,26 @@ def plot_layout_on_ax(ax: plt.Axes, hexes: List[Hex], colors: List[str], params:
     print(f"{(title or 'Layout')} | Bounding Box: {width_in:.1f} in x {height_in:.1f} in")
 
 
-def plot_layout(hexes: List[Hex], colors: List[str], params: LayoutParams, title: str = "") -> plt.Figure:
+def plot_layout(hexes: List[Hex], colors: List[str], params: LayoutParams, title: str = "",
+                xy: Optional[np.ndarray] = None) -> plt.Figure:
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(10, 8))
-    plot_layout_on_ax(ax, hexes, colors, params, title)
+    plot_layout_on_ax(ax, hexes, colors, params, title, xy)
     return fig
 
 # -------------------------------
 # CSV export
 # -------------------------------
 
-def export_csv(path: str, hexes: List[Hex], colors: List[str], params: LayoutParams) -> None:
+def export_csv(path: str, hexes: List[Hex], colors: List[str], params: LayoutParams,
+               xy: Optional[np.ndarray] = None) -> None:
+    if xy is None:
+        xy = axial_to_pixel_batch(hexes, params.radius)
     with open(path, 'w', newline='') as f:
         w = csv.writer(f)
         w.writerow(["q", "r", "x", "y", "color"])
-        for h, c in zip(hexes, colors):
-            x, y = axial_to_pixel(h, params.radius)
+        for h, c, (x, y) in zip(hexes, colors, xy.tolist()):
             w.writerow([h.q, h.r, f"{x:.6f}", f"{y:.6f}", c])
 
 # -------------------------------
@@ -426,23 +516,41 @@ def export_csv(path: str, hexes: List[Hex], colors: List[str], params: LayoutPar
 
 def generate_layout(rng: np.random.Generator, params: LayoutParams) -> Tuple[List[Hex], List[str]]:
     base_n = max(1, int(round(params.total_tiles * (1.0 - min(0.8, 0.12 * params.tendrils)))))
-    base_blob = grow_blob(base_n, rng, params)
-    full = add_tendrils(set(base_blob), params.total_tiles, rng, params)
-    if len(full) > params.total_tiles:
-        full = set(list(full)[: params.total_tiles])
+    # grow_blob stops at base_n <= total_tiles and add_tendrils at total_tiles, so the
+    # blob is extended in place and never needs trimming
+    full = add_tendrils(grow_blob(base_n, rng, params), params.total_tiles, rng, params)
     assert len(full) == params.total_tiles
-    hexes = list(full)
+    keys = list(full)
+    hexes = [decode(k) for k in keys]
 
     if params.color_mode == 'random':
         colors = assign_colors_random(len(hexes), rng, params)
     elif params.color_mode == 'gradient':
-        colors = assign_colors_gradient(hexes, rng, params)
+        colors = assign_colors_gradient(hexes, rng, params, keys_to_pixel(keys, params.radius))
     elif params.color_mode in ('scheme60', '60-30-10', 'scheme_60_30_10'):
-        colors = assign_colors_scheme60(hexes, rng, params)
+        colors = assign_colors_scheme60(hexes, rng, params, keys_to_pixel(keys, params.radius))
     else:
         raise ValueError("Unknown --color-mode. Use: random | gradient | scheme60")
 
-    return hexes, colors
+    # Sort once by (q, r) -- the packed keys order exactly that way -- so plotting can
+    # draw in list order; colours were assigned first and travel with their tiles
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [hexes[i] for i in order], [colors[i] for i in order]
+
+# Layouts are independent and pure-CPU, so composites of at least this many are
+# generated in worker processes (figures are still assembled in the parent)
+PARALLEL_MIN_LAYOUTS = 4
+
+def _worker(seed: int, params: LayoutParams) -> Tuple[List[Hex], List[str]]:
+    # Top-level so ProcessPoolExecutor can pickle it; same seeding as the sequential path
+    return generate_layout(np.random.default_rng(seed), params)
+
+def generate_layouts(seeds: Sequence[int], params: LayoutParams) -> List[Tuple[List[Hex], List[str]]]:
+    workers = min(len(seeds), os.cpu_count() or 1)
+    if len(seeds) >= PARALLEL_MIN_LAYOUTS and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(_worker, seeds, [params] * len(seeds)))
+    return [_worker(seed, params) for seed in seeds]
 
 # -------------------------------
 # CLI
@@ -530,6 +638,8 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
 
     args = p.parse_args(argv)
 
+    import matplotlib.pyplot as plt
+
     (aspect_w, aspect_h) = args.aspect
     (len_min, len_max) = args.tendril_len
 
@@ -565,7 +675,7 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         rng = np.random.default_rng(int(base_seed))
         hexes, colors = generate_layout(rng, params)
         title = (args.title or "Hexagonal Tile Layout") + f"  (#1, seed={int(base_seed)}, mode={params.color_mode})"
-        fig = plot_layout(hexes, colors, params, title)
+        fig = plot_layout(hexes, colors, params, title, axial_to_pixel_batch(hexes, params.radius))
         figs.append(fig)
         if args.save:
             out_path = args.save.replace('{i}', 'composite') if '{i}' in args.save else args.save
@@ -581,15 +691,15 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         fig, axes = plt.subplots(rows, cols, figsize=(cols * 6, rows * 6))
         axes_list = axes if isinstance(axes, np.ndarray) else np.array([[axes]])
         axes_flat = axes_list.flatten()
-        for i in range(N):
-            rng = np.random.default_rng(int(base_seed) + i)
-            hexes, colors = generate_layout(rng, params)
+        layouts = generate_layouts([int(base_seed) + i for i in range(N)], params)
+        for i, (hexes, colors) in enumerate(layouts):
+            xy = axial_to_pixel_batch(hexes, params.radius)  # shared by the plot and the CSV
             ax = axes_flat[i]
             title = (args.title or "Hexagonal Tile Layout") + f"  (#{i+1}, seed={int(base_seed)+i}, mode={params.color_mode})"
-            plot_layout_on_ax(ax, hexes, colors, params, title)
+            plot_layout_on_ax(ax, hexes, colors, params, title, xy)
             if args.export_csv:
                 csv_path = args.export_csv.replace('{i}', str(i+1)) if '{i}' in args.export_csv else args.export_csv
-                export_csv(csv_path, hexes, colors, params)
+                export_csv(csv_path, hexes, colors, params, xy)
                 print(f"Exported CSV: {csv_path}")
         for j in range(N, rows*cols):
             axes_flat[j].axis('off')
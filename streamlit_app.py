@@ -17,6 +17,8 @@ def main():
         st.session_state['uploaded_wall_image_bytes'] = None
     if 'active_wall_image_bytes' not in st.session_state:
         st.session_state['active_wall_image_bytes'] = None
+    if 'bg_canvas_image' not in st.session_state:
+        st.session_state['bg_canvas_image'] = None
 
     selected_view = st.radio(
         "Navigation",